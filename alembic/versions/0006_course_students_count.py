@@ -0,0 +1,29 @@
+"""denormalized courses.students_count
+
+Revision ID: 0006_course_students_count
+Revises: 0005_revoked_tokens
+Create Date: 2026-10-18 11:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_course_students_count"
+down_revision = "0005_revoked_tokens"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "courses",
+        sa.Column("students_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        "UPDATE courses SET students_count = "
+        "(SELECT count(*) FROM enrollments WHERE enrollments.course_id = courses.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("courses", "students_count")
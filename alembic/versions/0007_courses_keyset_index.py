@@ -0,0 +1,21 @@
+"""composite index for keyset pagination of courses
+
+Revision ID: 0007_courses_keyset_index
+Revises: 0006_course_students_count
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0007_courses_keyset_index"
+down_revision = "0006_course_students_count"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_courses_created_at_id", "courses", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_courses_created_at_id", table_name="courses")
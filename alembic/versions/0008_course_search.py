@@ -0,0 +1,47 @@
+"""full-text search index for courses
+
+Revision ID: 0008_course_search
+Revises: 0007_courses_keyset_index
+Create Date: 2026-10-18 13:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0008_course_search"
+down_revision = "0007_courses_keyset_index"
+branch_labels = None
+depends_on = None
+
+# SQL зафиксирован здесь, а не импортируется из app.services.search_service:
+# применённая миграция не должна меняться вместе с кодом приложения.
+SQLITE_CREATE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts "
+    "USING fts5(title, description, tokenize='unicode61 remove_diacritics 2')"
+)
+POSTGRES_ADD_VECTOR = (
+    "ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED"
+)
+POSTGRES_CREATE_GIN = "CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING gin (search_vector)"
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(POSTGRES_ADD_VECTOR)
+        op.execute(POSTGRES_CREATE_GIN)
+    elif dialect == "sqlite":
+        op.execute(SQLITE_CREATE_FTS)
+        op.execute(
+            "INSERT INTO courses_fts (rowid, title, description) "
+            "SELECT id, title, coalesce(description, '') FROM courses"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_courses_search_vector")
+        op.execute("ALTER TABLE courses DROP COLUMN IF EXISTS search_vector")
+    elif dialect == "sqlite":
+        op.execute("DROP TABLE IF EXISTS courses_fts")
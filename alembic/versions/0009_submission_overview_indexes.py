@@ -0,0 +1,37 @@
+"""composite indexes for the submission overview feed
+
+Revision ID: 0009_submission_overview_indexes
+Revises: 0008_course_search
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+from alembic import op
+
+revision = "0009_submission_overview_indexes"
+down_revision = "0008_course_search"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_assignment_submissions_submitted_at_id", "assignment_submissions", ["submitted_at", "id"])
+    op.create_index(
+        "ix_assignment_submissions_assignment_submitted",
+        "assignment_submissions",
+        ["assignment_id", "submitted_at", "id"],
+    )
+    op.create_index(
+        "ix_assignment_submissions_user_submitted",
+        "assignment_submissions",
+        ["user_id", "submitted_at", "id"],
+    )
+    op.drop_index("ix_assignment_submissions_assignment_id", table_name="assignment_submissions")
+    op.drop_index("ix_assignment_submissions_user_id", table_name="assignment_submissions")
+
+
+def downgrade() -> None:
+    op.create_index("ix_assignment_submissions_user_id", "assignment_submissions", ["user_id"])
+    op.create_index("ix_assignment_submissions_assignment_id", "assignment_submissions", ["assignment_id"])
+    op.drop_index("ix_assignment_submissions_user_submitted", table_name="assignment_submissions")
+    op.drop_index("ix_assignment_submissions_assignment_submitted", table_name="assignment_submissions")
+    op.drop_index("ix_assignment_submissions_submitted_at_id", table_name="assignment_submissions")
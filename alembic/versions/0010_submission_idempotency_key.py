@@ -0,0 +1,29 @@
+"""idempotency key for assignment submissions
+
+Revision ID: 0010_submission_idempotency_key
+Revises: 0009_submission_overview_indexes
+Create Date: 2026-10-18 12:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010_submission_idempotency_key"
+down_revision = "0009_submission_overview_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("assignment_submissions", sa.Column("idempotency_key", sa.String(length=100), nullable=True))
+    op.create_index(
+        "uq_assignment_submissions_user_idempotency_key",
+        "assignment_submissions",
+        ["user_id", "idempotency_key"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_assignment_submissions_user_idempotency_key", table_name="assignment_submissions")
+    op.drop_column("assignment_submissions", "idempotency_key")
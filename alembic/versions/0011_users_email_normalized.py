@@ -0,0 +1,61 @@
+"""normalized, indexed email for login lookups
+
+Revision ID: 0011_users_email_normalized
+Revises: 0010_submission_idempotency_key
+Create Date: 2026-10-18 16:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0011_users_email_normalized"
+down_revision = "0010_submission_idempotency_key"
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 1000
+
+
+def _normalize_email(email: str) -> str:
+    # Копия app.models.user.normalize_email: SQL lower()/trim() расходятся с Python
+    # на не-ASCII символах, а ключ должен совпадать с тем, что вычисляет приложение.
+    return email.strip().lower()
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("email_normalized", sa.String(length=255), nullable=True))
+    users = sa.table(
+        "users", sa.column("id", sa.Integer), sa.column("email", sa.String), sa.column("email_normalized", sa.String)
+    )
+    update = (
+        users.update().where(users.c.id == sa.bindparam("user_id")).values(email_normalized=sa.bindparam("key"))
+    )
+    bind = op.get_bind()
+    seen: set[str] = set()
+    last_id = 0
+    while rows := bind.execute(
+        sa.select(users.c.id, users.c.email).where(users.c.id > last_id).order_by(users.c.id).limit(BATCH_SIZE)
+    ).all():
+        params = []
+        for user_id, email in rows:
+            key = _normalize_email(email)
+            # Адреса, различавшиеся только регистром: ключ остаётся у самого раннего пользователя
+            # (его и находил прежний поиск по lower(email)), остальным ставится короткий служебный,
+            # который нормализация с lower() выдать не может.
+            if key in seen:
+                key = f"DUP-{user_id}"
+            else:
+                seen.add(key)
+            params.append({"user_id": user_id, "key": key})
+        bind.execute(update, params)
+        last_id = rows[-1].id
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.alter_column("email_normalized", existing_type=sa.String(length=255), nullable=False)
+    op.create_index("ix_users_email_normalized", "users", ["email_normalized"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_normalized", table_name="users")
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_column("email_normalized")
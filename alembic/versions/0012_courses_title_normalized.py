@@ -0,0 +1,61 @@
+"""case-insensitive unique course titles
+
+Revision ID: 0012_courses_title_normalized
+Revises: 0011_users_email_normalized
+Create Date: 2026-10-18 17:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0012_courses_title_normalized"
+down_revision = "0011_users_email_normalized"
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 1000
+
+
+def _normalize_title(title: str) -> str:
+    # Копия app.models.course.normalize_title: SQL lower()/trim() расходятся с Python
+    # на не-ASCII символах, а ключ должен совпадать с тем, что вычисляет приложение.
+    return title.strip().lower()
+
+
+def upgrade() -> None:
+    op.add_column("courses", sa.Column("title_normalized", sa.String(length=200), nullable=True))
+    courses = sa.table(
+        "courses", sa.column("id", sa.Integer), sa.column("title", sa.String), sa.column("title_normalized", sa.String)
+    )
+    update = (
+        courses.update().where(courses.c.id == sa.bindparam("course_id")).values(title_normalized=sa.bindparam("key"))
+    )
+    bind = op.get_bind()
+    seen: set[str] = set()
+    last_id = 0
+    while rows := bind.execute(
+        sa.select(courses.c.id, courses.c.title).where(courses.c.id > last_id).order_by(courses.c.id).limit(BATCH_SIZE)
+    ).all():
+        params = []
+        for course_id, title in rows:
+            key = _normalize_title(title)
+            # Дубликаты, созданные гонкой прежней проверки: ключ остаётся у самого раннего курса,
+            # остальные сохраняют название, но получают короткий служебный ключ,
+            # который нормализация с lower() выдать не может.
+            if key in seen:
+                key = f"DUP-{course_id}"
+            else:
+                seen.add(key)
+            params.append({"course_id": course_id, "key": key})
+        bind.execute(update, params)
+        last_id = rows[-1].id
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.alter_column("title_normalized", existing_type=sa.String(length=200), nullable=False)
+    op.create_index("ix_courses_title_normalized", "courses", ["title_normalized"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_courses_title_normalized", table_name="courses")
+    with op.batch_alter_table("courses") as batch_op:
+        batch_op.drop_column("title_normalized")
@@ -0,0 +1,25 @@
+"""courses.pending_delete for resumable background deletes
+
+Revision ID: 0013_courses_pending_delete
+Revises: 0012_courses_title_normalized
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0013_courses_pending_delete"
+down_revision = "0012_courses_title_normalized"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "courses",
+        sa.Column("pending_delete", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("courses", "pending_delete")
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_admin
+from app.core.cache import cache_stats
+from app.db.session import get_db
+from app.services.assignment_submission_service import export_submission_overview
+from app.services.course_service import get_course
+from app.services.course_suggest import title_index
+from app.services.enrollment_service import export_course_students
+from app.services.export_service import MEDIA_TYPES, ExportFormat
+from app.utils.streaming import streaming_export
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/stats")
+def read_stats(_=Depends(get_current_admin)):
+    return {
+        "caches": cache_stats(),
+        "course_suggest_index": title_index.stats(),
+    }
+
+
+@router.get("/exports/submissions")
+def export_submissions(
+    format: ExportFormat = Query("csv"),
+    course_id: int | None = None,
+    assignment_id: int | None = None,
+    student_id: int | None = None,
+    submitted_from: datetime | None = Query(None, description="Не раньше (включительно)"),
+    submitted_to: datetime | None = Query(None, description="Раньше (не включительно)"),
+    db: Session = Depends(get_db),
+    _=Depends(get_current_admin),
+):
+    rows = export_submission_overview(
+        db,
+        format,
+        course_id=course_id,
+        assignment_id=assignment_id,
+        student_id=student_id,
+        submitted_from=submitted_from,
+        submitted_to=submitted_to,
+    )
+    return streaming_export(rows, MEDIA_TYPES[format], filename=f"submissions.{format}")
+
+
+@router.get("/exports/courses/{course_id}/students")
+def export_students(
+    course_id: int,
+    format: ExportFormat = Query("csv"),
+    db: Session = Depends(get_db),
+    _=Depends(get_current_admin),
+):
+    if get_course(db, course_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Курс не найден")
+    rows = export_course_students(db, course_id, format)
+    return streaming_export(rows, MEDIA_TYPES[format], filename=f"course-{course_id}-students.{format}")
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.api.deps import get_current_admin, get_current_user
+from app.api.deps import ensure_course_access, get_current_admin, get_current_user
+from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import UserRole
 from app.schemas.assignment import AssignmentCreate, AssignmentResponse, AssignmentUpdate
 from app.schemas.assignment_submission import (
     AssignmentSubmissionCreate,
-    AssignmentSubmissionOverview,
     AssignmentSubmissionResponse,
 )
+from app.schemas.pagination import CursorPaginatedSubmissionOverview
 from app.services.assignment_service import (
     create_assignment,
     delete_assignment,
@@ -20,12 +26,18 @@ from app.services.assignment_service import (
 )
 from app.services.assignment_submission_service import (
     create_submission,
-    list_submission_overview,
+    export_submission_overview,
+    list_submission_overview_page,
     list_submissions_for_assignment,
     list_submissions_for_user,
+    submission_values,
+    validate_submission,
 )
 from app.services.course_service import get_course
-from app.services.enrollment_service import get_enrollment
+from app.services.export_service import MEDIA_TYPES
+from app.services.submission_writer import SubmissionQueueFull, submission_writer
+from app.utils.exceptions import client_error
+from app.utils.streaming import streaming_export
 
 router = APIRouter(prefix="/assignments", tags=["assignments"])
 
@@ -41,10 +53,7 @@ def read_course_assignments(course_id: int, current_user=Depends(get_current_use
     course = get_course(db, course_id)
     if course is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Курс не найден")
-    if current_user.role != UserRole.admin:
-        enrollment = get_enrollment(db, current_user.id, course_id)
-        if enrollment is None:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Доступ запрещен")
+    ensure_course_access(db, course_id, current_user)
     return list_assignments_for_course(db, course_id)
 
 
@@ -67,43 +76,79 @@ def read_assignment_submissions(
     return submissions
 
 
-@router.get("/admin-overview", response_model=list[AssignmentSubmissionOverview])
-def read_all_submissions(db: Session = Depends(get_db), _=Depends(get_current_admin)):
-    records = list_submission_overview(db)
-    return [
-        AssignmentSubmissionOverview(
-            submission_id=submission.id,
-            assignment_id=assignment.id,
-            assignment_title=assignment.title,
-            course_id=course.id,
-            course_title=course.title,
-            student_id=user.id,
-            student_email=user.email,
-            message=submission.message,
-            link=submission.link,
-            submitted_at=submission.submitted_at,
-        )
-        for submission, assignment, course, user in records
-    ]
+@router.get("/admin-overview", response_model=CursorPaginatedSubmissionOverview)
+def read_all_submissions(
+    cursor: str | None = Query(None, description="next_cursor предыдущей страницы"),
+    limit: int = Query(50, ge=1, le=500),
+    course_id: int | None = None,
+    assignment_id: int | None = None,
+    student_id: int | None = None,
+    submitted_from: datetime | None = Query(None, description="Не раньше (включительно)"),
+    submitted_to: datetime | None = Query(None, description="Раньше (не включительно)"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson — вся выборка потоком, без пагинации"),
+    db: Session = Depends(get_db),
+    _=Depends(get_current_admin),
+):
+    filters = {
+        "course_id": course_id,
+        "assignment_id": assignment_id,
+        "student_id": student_id,
+        "submitted_from": submitted_from,
+        "submitted_to": submitted_to,
+    }
+    if format == "ndjson":
+        return streaming_export(export_submission_overview(db, "ndjson", **filters), MEDIA_TYPES["ndjson"])
+    try:
+        items, next_cursor = list_submission_overview_page(db, cursor=cursor, limit=limit, **filters)
+    except ValueError as exc:
+        raise client_error("INVALID_CURSOR", "Некорректный курсор", field="cursor") from exc
+    return CursorPaginatedSubmissionOverview(items=items, next_cursor=next_cursor, limit=limit)
 
 
 @router.post("/{assignment_id}/submit", response_model=AssignmentSubmissionResponse, status_code=status.HTTP_201_CREATED)
-def submit_assignment(
+async def submit_assignment(
     assignment_id: int,
     payload: AssignmentSubmissionCreate,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
+    idempotency_key: str | None = Header(None, max_length=100),
 ):
+    """С Idempotency-Key повтор запроса возвращает уже сохранённое решение, а не создаёт второе.
+
+    При SUBMISSION_INGEST_MODE=batched решение после проверок пишется групповым commit'ом.
+    """
     if current_user.role != UserRole.student:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Только студенты могут отправлять решения")
-    assignment = get_assignment(db, assignment_id)
-    if assignment is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задание не найдено")
+    args = (db, current_user.id, assignment_id, payload, idempotency_key)
     try:
-        submission = create_submission(db, current_user.id, assignment, payload)
+        if settings.submission_ingest_mode != "batched":
+            return await run_in_threadpool(create_submission, *args)
+        previous = await run_in_threadpool(validate_submission, *args)
+        if previous is not None:
+            return previous
+        # Не держим соединение из пула, пока решение ждёт своей пачки; close() делает ROLLBACK, поэтому не в event loop.
+        await run_in_threadpool(db.close)
+        values = submission_values(current_user.id, assignment_id, payload, idempotency_key)
+        try:
+            stored = await submission_writer.submit(values)
+        except IntegrityError as exc:
+            # Параллельный повтор с тем же ключом успел записаться первым, либо задание или запись
+            # на курс удалили после проверки: повторная проверка вернёт сохранённое решение или 404/400.
+            previous = await run_in_threadpool(validate_submission, *args)
+            if previous is None:
+                raise client_error(
+                    "SUBMISSION_CONFLICT", "Решение не сохранено, повторите отправку", status_code=409
+                ) from exc
+            return previous
+    except SubmissionQueueFull as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис перегружен, повторите позже",
+            headers={"Retry-After": "1"},
+        ) from exc
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    return submission
+    return AssignmentSubmissionResponse(id=stored.id, submitted_at=stored.submitted_at, **values)
 
 
 @router.post("/courses/{course_id}", response_model=AssignmentResponse, status_code=status.HTTP_201_CREATED)
@@ -1,52 +1,62 @@
 import logging
-import time
-from collections import defaultdict
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from jose import JWTError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.core.config import settings
+from app.core.hashing import HashingQueueFull, password_hasher
+from app.core.login_limiter import build_login_limiter
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_refresh_token,
-    is_refresh_token_revoked,
     revoke_refresh_token,
-    verify_password,
 )
 from app.db.session import get_db
+from app.models.user import normalize_email
 from app.schemas.token import RefreshRequest, TokenPair
 from app.schemas.user import UserCreate, UserLogin, UserResponse
 from app.services.user_service import create_user, get_user_by_email
 
 logger = logging.getLogger("app.auth")
-_login_attempts: dict[str, list[float]] = defaultdict(list)
+login_limiter = build_login_limiter()
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-def _prune_attempts(attempts: list[float]) -> None:
-    now = time.monotonic()
-    window = settings.login_attempts_window_seconds
-    while attempts and now - attempts[0] > window:
-        attempts.pop(0)
+def _hashing_unavailable() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Сервис перегружен, повторите позже",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _release_connection(db: Session) -> None:
+    # Не держим соединение из пула, пока запрос ждёт argon2.
+    db.close()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)):
+async def register_user(payload: UserCreate, db: Session = Depends(get_db)):
     if payload.role != "student":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Регистрация доступна только для роли student",
         )
-    if get_user_by_email(db, payload.email):
+    if await run_in_threadpool(get_user_by_email, db, payload.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким email уже существует",
         )
+    _release_connection(db)
+    try:
+        hashed_password = await password_hasher.hash(payload.password)
+    except HashingQueueFull as exc:
+        raise _hashing_unavailable() from exc
     try:
-        user = create_user(db, payload, role=payload.role)
+        user = await run_in_threadpool(create_user, db, payload, payload.role, hashed_password)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
     return UserResponse(
@@ -59,24 +69,27 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=TokenPair)
-def login(payload: UserLogin, db: Session = Depends(get_db)):
-    email = payload.email.lower()
-    attempts = _login_attempts[email]
-    _prune_attempts(attempts)
-    if len(attempts) >= settings.login_attempts_limit:
+async def login(payload: UserLogin, db: Session = Depends(get_db)):
+    email = normalize_email(payload.email)
+    if await run_in_threadpool(login_limiter.is_blocked, email):
         logger.warning("Exceeded login attempts for %s", email)
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Слишком много попыток, повторите позже",
         )
-    user = get_user_by_email(db, payload.email)
-    if not user or not verify_password(payload.password, user.hashed_password):
-        attempts.append(time.monotonic())
+    user = await run_in_threadpool(get_user_by_email, db, payload.email)
+    _release_connection(db)
+    try:
+        verified = user is not None and await password_hasher.verify(payload.password, user.hashed_password)
+    except HashingQueueFull as exc:
+        raise _hashing_unavailable() from exc
+    if not verified:
+        await run_in_threadpool(login_limiter.record_failure, email)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
-    attempts.clear()
+    await run_in_threadpool(login_limiter.reset, email)
     access_token = create_access_token(data={"sub": str(user.id), "role": user.role.value})
     refresh_token = create_refresh_token(data={"sub": str(user.id), "role": user.role.value})
     logger.info("User %s logged in", user.email)
@@ -89,23 +102,22 @@ def refresh_tokens(payload: RefreshRequest):
         token_data = decode_refresh_token(payload.refresh_token)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
-    if is_refresh_token_revoked(payload.refresh_token):
+    # Сначала отзыв: из параллельных повторов одного refresh-токена новую пару получает только первый.
+    if not revoke_refresh_token(token_data):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token revoked")
     access_token = create_access_token(data={"sub": str(token_data.user_id), "role": token_data.role})
     new_refresh_token = create_refresh_token(data={"sub": str(token_data.user_id), "role": token_data.role})
-    revoke_refresh_token(payload.refresh_token)
     logger.info("Refresh token rotated for user %s", token_data.user_id)
     return TokenPair(access_token=access_token, refresh_token=new_refresh_token)
 
 
 @router.post("/logout")
 def logout(payload: RefreshRequest):
-    if is_refresh_token_revoked(payload.refresh_token):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token already revoked")
     try:
         token_data = decode_refresh_token(payload.refresh_token)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
-    revoke_refresh_token(payload.refresh_token)
+    if not revoke_refresh_token(token_data):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token already revoked")
     logger.info("User %s logged out", token_data.user_id)
     return {"detail": "Logged out"}
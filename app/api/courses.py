@@ -1,70 +1,134 @@
-from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy import func
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_admin, get_current_user_optional
+from app.api.deps import ensure_course_access, get_current_admin, get_current_user, get_current_user_optional
 from app.db.session import get_db
-from app.models.enrollment import Enrollment
 from app.models.user import UserRole
 from app.schemas.course import (
     COURSE_LEVELS,
+    CourseAssignmentStatus,
     CourseCreate,
+    CourseFullResponse,
     CourseLevelInfo,
     CourseResponse,
+    CourseSuggestion,
     CourseUpdate,
 )
-from app.schemas.pagination import PaginatedCourses
+from app.schemas.pagination import CursorPaginatedCourses, PaginatedCourses
+from app.services.assignment_service import list_assignments_for_course
+from app.services.assignment_submission_service import latest_submissions_for_course
+from app.services.catalog_cache import catalog_key, get_catalog_page, role_class, store_catalog_page
+from app.services.course_suggest import title_index
 from app.services.course_service import (
     create_course,
     delete_course,
     get_course,
+    hide_course,
     list_courses,
+    list_courses_keyset,
+    purge_course,
     update_course,
 )
+from app.services.material_service import list_materials
 from app.utils.exceptions import client_error
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
 
-@router.get("/", response_model=PaginatedCourses)
+def _course_response(course) -> CourseResponse:
+    return CourseResponse(
+        id=course.id,
+        title=course.title,
+        description=course.description,
+        is_published=course.is_published,
+        created_by=course.created_by,
+        created_at=course.created_at,
+        students_count=course.students_count,
+        level=course.level,
+        duration_minutes=course.duration_minutes,
+    )
+
+
+@router.get("/", response_model=PaginatedCourses | CursorPaginatedCourses)
 def read_courses(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     search: str | None = None,
     is_published: bool | None = None,
+    cursor: str | None = Query(None, description="Курсор из next_cursor; пустая строка — первая страница"),
+    include_total: bool = Query(False, description="Считать total в режиме курсора"),
     current_user=Depends(get_current_user_optional),
     db: Session = Depends(get_db),
 ):
     is_admin = current_user and current_user.role == UserRole.admin
     published_only = not is_admin
     filters_published = is_published if is_admin else None
-    items, total = list_courses(
-        db,
-        skip=skip,
-        limit=limit,
-        search=search,
-        published_only=published_only,
-        is_published=filters_published,
-    )
-    return PaginatedCourses(
-        items=[
-            CourseResponse(
-                id=course.id,
-                title=course.title,
-                description=course.description,
-                is_published=course.is_published,
-                created_by=course.created_by,
-                created_at=course.created_at,
-                students_count=count,
-                level=course.level,
-                duration_minutes=course.duration_minutes,
+    cache_key = None
+    if not is_admin:
+        # Версия фиксируется до запроса к БД, поэтому гонка с записью не попадёт в кэш.
+        page = ("cursor", cursor, include_total) if cursor is not None else ("offset", skip)
+        cache_key = catalog_key(*page, limit, search, role_class(current_user))
+        body = get_catalog_page(cache_key)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+    if cursor is not None:
+        try:
+            items, next_cursor, total = list_courses_keyset(
+                db,
+                cursor=cursor,
+                limit=limit,
+                search=search,
+                published_only=published_only,
+                is_published=filters_published,
+                with_total=include_total,
             )
-            for course, count in items
-        ],
-        total=total,
-        skip=skip,
-        limit=min(limit, 100),
-    )
+        except ValueError as exc:
+            raise client_error("INVALID_CURSOR", "Некорректный курсор", field="cursor") from exc
+        result = CursorPaginatedCourses(
+            items=[_course_response(course) for course in items],
+            next_cursor=next_cursor,
+            limit=min(limit, 100),
+            total=total,
+        )
+    else:
+        items, total = list_courses(
+            db,
+            skip=skip,
+            limit=limit,
+            search=search,
+            published_only=published_only,
+            is_published=filters_published,
+        )
+        result = PaginatedCourses(
+            items=[
+                _course_response(course)
+                for course in items
+            ],
+            total=total,
+            skip=skip,
+            limit=min(limit, 100),
+        )
+    if cache_key is None:
+        return result
+    body = result.json().encode()
+    store_catalog_page(cache_key, body)
+    return Response(content=body, media_type="application/json")
+
+
+# Статические пути объявлены до /{course_id}, иначе их перехватит параметризованный маршрут.
+@router.get("/levels", response_model=list[CourseLevelInfo])
+def read_course_levels():
+    return COURSE_LEVELS
+
+
+@router.get("/suggest", response_model=list[CourseSuggestion])
+def suggest_courses(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=20),
+    db: Session = Depends(get_db),
+):
+    title_index.ensure_loaded(db)
+    return [CourseSuggestion(id=course_id, title=title) for course_id, title in title_index.suggest(q, limit)]
 
 
 @router.post("/", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
@@ -74,17 +138,7 @@ def create_new_course(
     current_admin=Depends(get_current_admin),
 ):
     course = create_course(db, payload, current_admin.id)
-    return CourseResponse(
-        id=course.id,
-        title=course.title,
-        description=course.description,
-        is_published=course.is_published,
-        created_by=course.created_by,
-        created_at=course.created_at,
-        students_count=0,
-        level=course.level,
-        duration_minutes=course.duration_minutes,
-    )
+    return _course_response(course)
 
 
 @router.put("/{course_id}", response_model=CourseResponse)
@@ -98,34 +152,24 @@ def edit_course(
     if course is None:
         raise client_error("COURSE_NOT_FOUND", "Курс не найден", status_code=404)
     course = update_course(db, course, payload)
-    students_count = (
-        db.query(func.count(Enrollment.id))
-        .filter(Enrollment.course_id == course.id)
-        .scalar()
-        or 0
-    )
-    return CourseResponse(
-        id=course.id,
-        title=course.title,
-        description=course.description,
-        is_published=course.is_published,
-        created_by=course.created_by,
-        created_at=course.created_at,
-        students_count=students_count,
-        level=course.level,
-        duration_minutes=course.duration_minutes,
-    )
+    return _course_response(course)
 
 
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
 def remove_course(
     course_id: int,
+    background_tasks: BackgroundTasks,
+    background: bool = Query(False, description="Для очень больших курсов: скрыть сразу, удалить пачками в фоне (202)"),
     db: Session = Depends(get_db),
     current_admin=Depends(get_current_admin),
 ):
     course = get_course(db, course_id)
     if course is None:
         raise client_error("COURSE_NOT_FOUND", "Курс не найден", status_code=404)
+    if background:
+        hide_course(db, course)
+        background_tasks.add_task(purge_course, course_id)
+        return Response(status_code=status.HTTP_202_ACCEPTED)
     delete_course(db, course)
 
 
@@ -140,25 +184,43 @@ def read_course(
         raise client_error("COURSE_NOT_FOUND", "Курс не найден", status_code=404)
     if not course.is_published and (not current_user or current_user.role != UserRole.admin):
         raise client_error("COURSE_NOT_FOUND", "Курс не найден", status_code=404)
-    students_count = (
-        db.query(func.count(Enrollment.id))
-        .filter(Enrollment.course_id == course.id)
-        .scalar()
-        or 0
-    )
-    return CourseResponse(
-        id=course.id,
-        title=course.title,
-        description=course.description,
-        is_published=course.is_published,
-        created_by=course.created_by,
-        created_at=course.created_at,
-        students_count=students_count,
-        level=course.level,
-        duration_minutes=course.duration_minutes,
-    )
+    return _course_response(course)
 
 
-@router.get("/levels", response_model=list[CourseLevelInfo])
-def read_course_levels():
-    return COURSE_LEVELS
+@router.get("/{course_id}/full", response_model=CourseFullResponse)
+def read_course_full(
+    course_id: int,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """Курс, материалы, задания и статус текущего пользователя за один запрос к API.
+
+    Права те же, что у /courses/{id}/materials и /assignments/courses/{id}.
+    """
+    course = get_course(db, course_id)
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Курс не найден")
+    # Содержимое читается только после проверки доступа, как в /courses/{id}/materials.
+    enrollment = ensure_course_access(db, course_id, current_user)
+    materials = list_materials(db, course_id)
+    assignments = list_assignments_for_course(db, course_id)
+    latest = latest_submissions_for_course(db, current_user.id, course_id)
+    return CourseFullResponse(
+        course=_course_response(course),
+        materials=materials,
+        assignments=[
+            CourseAssignmentStatus(
+                id=assignment.id,
+                course_id=assignment.course_id,
+                title=assignment.title,
+                description=assignment.description,
+                link=assignment.link,
+                due_date=assignment.due_date,
+                created_at=assignment.created_at,
+                submission_status="submitted" if assignment.id in latest else "not_submitted",
+                latest_submission=latest.get(assignment.id),
+            )
+            for assignment in assignments
+        ],
+        enrollment=enrollment,
+    )
@@ -10,7 +10,8 @@ from sqlalchemy.orm import Session
 from app.core.security import TokenData, decode_access_token
 from app.db.session import get_db
 from app.models.user import UserRole
-from app.services.user_service import get_user
+from app.services.enrollment_service import get_enrollment
+from app.services.user_service import get_principal
 
 http_bearer = HTTPBearer(auto_error=True)
 http_bearer_optional = HTTPBearer(auto_error=False)
@@ -24,7 +25,7 @@ def get_current_user(
         token_data: TokenData = decode_access_token(credentials.credentials)
     except JWTError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials") from exc
-    user = get_user(db, token_data.user_id)
+    user = get_principal(db, token_data.user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
@@ -46,5 +47,20 @@ def get_current_user_optional(
         token_data: TokenData = decode_access_token(credentials.credentials)
     except JWTError:
         return None
-    user = get_user(db, token_data.user_id)
+    user = get_principal(db, token_data.user_id)
     return user
+
+
+def ensure_course_access(db: Session, course_id: int, user):
+    """Общее правило доступа к содержимому курса: админ или записанный на курс пользователь.
+
+    Возвращает запись пользователя на курс (у админа — None).
+    """
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Доступ запрещен")
+    if user.role == UserRole.admin:
+        return None
+    enrollment = get_enrollment(db, user.id, course_id)
+    if enrollment is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Доступ запрещен")
+    return enrollment
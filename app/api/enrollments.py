@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_admin, get_current_user
 from app.db.session import get_db
 from app.models.user import UserRole
-from app.schemas.enrollment import EnrollmentResponse
+from app.schemas.enrollment import BulkEnrollmentRequest, BulkEnrollmentResponse, EnrollmentResponse
 from app.schemas.user import UserResponse
 from app.services.course_service import get_course
 from app.services.enrollment_service import (
+    bulk_enroll,
     create_enrollment,
     list_course_students,
     list_student_enrollments,
@@ -21,14 +22,27 @@ def enroll_step(
     course_id: int,
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
+    idempotency_key: str | None = Header(None, max_length=100),
 ):
+    """С Idempotency-Key повтор запроса возвращает ту же запись (201) вместо 409."""
     if current_user.role != UserRole.student:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Только студенты могут записываться")
+    return create_enrollment(db, current_user.id, course_id, idempotent=idempotency_key is not None)
+
+
+@router.post("/courses/{course_id}/enrollments/bulk", response_model=BulkEnrollmentResponse)
+def enroll_bulk(
+    course_id: int,
+    payload: BulkEnrollmentRequest,
+    db: Session = Depends(get_db),
+    _=Depends(get_current_admin),
+):
     course = get_course(db, course_id)
-    if not course or not course.is_published:
+    if course is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Курс не найден")
-    enrollment = create_enrollment(db, current_user.id, course)
-    return enrollment
+    result = bulk_enroll(db, course, payload.user_ids, payload.emails)
+    # До 10k строк результата: сериализуем один раз, без повторной валидации и jsonable_encoder.
+    return Response(content=result.json(), media_type="application/json")
 
 
 @router.get("/me/enrollments", response_model=list[EnrollmentResponse])
@@ -1,12 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_admin, get_current_user_optional
+from app.api.deps import ensure_course_access, get_current_admin, get_current_user_optional
 from app.db.session import get_db
-from app.models.user import UserRole
 from app.schemas.material import MaterialCreate, MaterialResponse
 from app.services.course_service import get_course
-from app.services.enrollment_service import get_enrollment
 from app.services.material_service import (
     create_material,
     delete_material,
@@ -26,12 +24,7 @@ def read_materials(
     course = get_course(db, course_id)
     if course is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Курс не найден")
-    if current_user is None:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Доступ запрещен")
-    if current_user.role != UserRole.admin:
-        enrollment = get_enrollment(db, current_user.id, course_id)
-        if enrollment is None:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Доступ запрещен")
+    ensure_course_access(db, course_id, current_user)
     materials = list_materials(db, course_id)
     return materials
 
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user
+from app.db.session import get_db
+from app.models.user import UserRole
+from app.schemas.bootstrap import BootstrapResponse
+from app.schemas.pagination import CursorPaginatedSubmissionOverview, PaginatedCourses
+from app.services.assignment_service import list_assignments_for_user
+from app.services.assignment_submission_service import list_submission_overview_page
+from app.services.catalog_cache import catalog_key, get_catalog_page, role_class, store_catalog_page
+from app.services.course_service import list_courses
+from app.services.enrollment_service import list_student_enrollments
+from app.utils.exceptions import client_error
+
+router = APIRouter(prefix="/me", tags=["me"])
+
+
+@router.get("/bootstrap", response_model=BootstrapResponse)
+def read_bootstrap(
+    courses_limit: int = Query(10, ge=1, le=100),
+    assignments_limit: int = Query(100, ge=1, le=500),
+    overview_limit: int = Query(20, ge=1, le=100),
+    overview_cursor: str | None = Query(None, description="next_cursor из admin_overview"),
+    current_user=Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Всё, что дашборд запрашивал пятью вызовами: профиль, курсы, записи, задания и (для админа) ленту решений.
+
+    Каждый раздел ограничен по размеру, лента решений листается курсором.
+    """
+    is_admin = current_user.role == UserRole.admin
+    courses = None
+    if not is_admin:
+        # Та же страница, что у GET /courses без параметров, и тот же кэш каталога.
+        cache_key = catalog_key("offset", 0, courses_limit, None, role_class(current_user))
+        body = get_catalog_page(cache_key)
+        if body is not None:
+            courses = PaginatedCourses.parse_raw(body)
+    if courses is None:
+        items, total = list_courses(db, limit=courses_limit, published_only=not is_admin)
+        courses = PaginatedCourses(items=items, total=total, skip=0, limit=courses_limit)
+        if not is_admin:
+            store_catalog_page(cache_key, courses.json().encode())
+    admin_overview = None
+    if is_admin:
+        try:
+            items, next_cursor = list_submission_overview_page(db, cursor=overview_cursor, limit=overview_limit)
+        except ValueError as exc:
+            raise client_error("INVALID_CURSOR", "Некорректный курсор", field="overview_cursor") from exc
+        admin_overview = CursorPaginatedSubmissionOverview(items=items, next_cursor=next_cursor, limit=overview_limit)
+    return BootstrapResponse(
+        user=current_user,
+        courses=courses,
+        enrollments=[] if is_admin else list_student_enrollments(db, current_user.id),
+        assignments=list_assignments_for_user(db, current_user, limit=assignments_limit),
+        admin_overview=admin_overview,
+    )
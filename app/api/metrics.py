@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import get_current_admin
+from app.core.metrics import metrics
+from app.db.session import engine
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics(_=Depends(get_current_admin)):
+    return PlainTextResponse(metrics.render(engine), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,44 @@
+"""Служебные команды: python -m app.commands <команда>."""
+from __future__ import annotations
+
+import argparse
+
+from app.db.session import SessionLocal
+from app.services.course_service import purge_pending_courses, repair_students_count
+from app.services.search_service import rebuild_search_index
+
+
+def _repair_students_count() -> None:
+    with SessionLocal() as db:
+        fixed = repair_students_count(db)
+    print(f"students_count fixed for {fixed} course(s)")
+
+
+def _purge_deleted_courses() -> None:
+    with SessionLocal() as db:
+        purged, failed = purge_pending_courses(db)
+    print(f"pending course deletes finished: {purged}, failed: {failed}")
+
+
+def _rebuild_search_index() -> None:
+    with SessionLocal() as db:
+        rebuild_search_index(db)
+    print("course search index rebuilt")
+
+
+COMMANDS = {
+    "purge-deleted-courses": _purge_deleted_courses,
+    "rebuild-search-index": _rebuild_search_index,
+    "repair-students-count": _repair_students_count,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.commands")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,12 @@ from __future__ import annotations
 from typing import List
 
 from pydantic import BaseSettings, Field, validator
+from sqlalchemy.engine import make_url
+
+# Запись без гонок (ON CONFLICT), полнотекстовый поиск и каскады опираются на эти две СУБД.
+SUPPORTED_DATABASES = ("postgresql", "sqlite")
+SUBMISSION_INGEST_MODES = ("direct", "batched")
+SUBMISSION_DURABILITY_MODES = ("strict", "relaxed")
 
 
 class Settings(BaseSettings):
@@ -13,13 +19,57 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = Field(30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
     refresh_token_expire_minutes: int = Field(60 * 24 * 7, env="REFRESH_TOKEN_EXPIRE_MINUTES")
     environment: str = Field("development", env="ENVIRONMENT")
+    debug: bool = Field(False, env="DEBUG")
+    n_plus_one_threshold: int = Field(10, env="N_PLUS_ONE_THRESHOLD")
     cors_origins: List[str] = Field(default_factory=list, env="CORS_ORIGINS")
     require_https: bool = Field(False, env="REQUIRE_HTTPS")
     rate_limit_requests: int = Field(120, env="RATE_LIMIT_REQUESTS")
     rate_limit_window_seconds: int = Field(60, env="RATE_LIMIT_WINDOW_SECONDS")
+    rate_limit_max_clients: int = Field(100000, env="RATE_LIMIT_MAX_CLIENTS")
+    rate_limit_auth_cost: int = Field(1, env="RATE_LIMIT_AUTH_COST")
     login_attempts_limit: int = Field(5, env="LOGIN_ATTEMPTS_LIMIT")
     login_attempts_window_seconds: int = Field(300, env="LOGIN_ATTEMPTS_WINDOW_SECONDS")
+    login_attempts_max_keys: int = Field(100000, env="LOGIN_ATTEMPTS_MAX_KEYS")
+    login_attempts_backend: str = Field("memory", env="LOGIN_ATTEMPTS_BACKEND")
+    login_attempts_sqlite_path: str = Field("./login_attempts.db", env="LOGIN_ATTEMPTS_SQLITE_PATH")
     max_request_size: int = Field(1048576, env="MAX_REQUEST_SIZE")
+    max_auth_request_size: int = Field(16384, env="MAX_AUTH_REQUEST_SIZE")
+    max_submission_request_size: int = Field(4194304, env="MAX_SUBMISSION_REQUEST_SIZE")
+    password_hash_workers: int = Field(2, env="PASSWORD_HASH_WORKERS")
+    password_hash_queue_size: int = Field(64, env="PASSWORD_HASH_QUEUE_SIZE")
+    access_token_cache_size: int = Field(10000, env="ACCESS_TOKEN_CACHE_SIZE")
+    principal_cache_enabled: bool = Field(True, env="PRINCIPAL_CACHE_ENABLED")
+    principal_cache_ttl_seconds: int = Field(60, env="PRINCIPAL_CACHE_TTL_SECONDS")
+    principal_cache_size: int = Field(10000, env="PRINCIPAL_CACHE_SIZE")
+    course_catalog_cache_size: int = Field(1024, env="COURSE_CATALOG_CACHE_SIZE")
+    course_catalog_cache_ttl_seconds: int = Field(30, env="COURSE_CATALOG_CACHE_TTL_SECONDS")
+    course_suggest_ttl_seconds: int = Field(300, env="COURSE_SUGGEST_TTL_SECONDS")
+    token_revocation_backend: str = Field("memory", env="TOKEN_REVOCATION_BACKEND")
+    submission_ingest_mode: str = Field("direct", env="SUBMISSION_INGEST_MODE")
+    submission_batch_interval_ms: int = Field(5, env="SUBMISSION_BATCH_INTERVAL_MS")
+    submission_batch_max_size: int = Field(500, env="SUBMISSION_BATCH_MAX_SIZE")
+    submission_queue_size: int = Field(10000, env="SUBMISSION_QUEUE_SIZE")
+    submission_durability: str = Field("strict", env="SUBMISSION_DURABILITY")
+    course_delete_chunk_size: int = Field(5000, env="COURSE_DELETE_CHUNK_SIZE")
+
+    @validator("database_url")
+    def check_database_backend(cls, value: str) -> str:
+        backend = make_url(value).get_backend_name()
+        if backend not in SUPPORTED_DATABASES:
+            raise ValueError(f"DATABASE_URL must point to one of {', '.join(SUPPORTED_DATABASES)}, got {backend}")
+        return value
+
+    @validator("submission_ingest_mode")
+    def check_submission_ingest_mode(cls, value: str) -> str:
+        if value not in SUBMISSION_INGEST_MODES:
+            raise ValueError(f"SUBMISSION_INGEST_MODE must be one of {', '.join(SUBMISSION_INGEST_MODES)}")
+        return value
+
+    @validator("submission_durability")
+    def check_submission_durability(cls, value: str) -> str:
+        if value not in SUBMISSION_DURABILITY_MODES:
+            raise ValueError(f"SUBMISSION_DURABILITY must be one of {', '.join(SUBMISSION_DURABILITY_MODES)}")
+        return value
 
     @validator("cors_origins", pre=True)
     def split_cors(cls, value: str | List[str] | None):
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from app.core import security
+from app.core.config import settings
+
+
+class HashingQueueFull(RuntimeError):
+    pass
+
+
+class PasswordHashingService:
+    """Argon2 в отдельных процессах, чтобы не занимать thread pool AnyIO.
+
+    Очередь ограничена: при переполнении сразу бросаем HashingQueueFull,
+    а не копим ожидающие запросы.
+    """
+
+    def __init__(self, workers: int, queue_size: int) -> None:
+        self.workers = max(workers, 1)
+        self.queue_size = max(queue_size, 1)
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.queue_size:
+                raise HashingQueueFull("Password hashing queue is full")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(security.get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(security.verify_password, plain_password, hashed_password)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHashingService(
+    workers=settings.password_hash_workers,
+    queue_size=settings.password_hash_queue_size,
+)
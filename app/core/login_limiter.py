@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Protocol
+
+from app.core.config import settings
+
+
+class AttemptLimiter(Protocol):
+    def is_blocked(self, key: str) -> bool: ...
+
+    def record_failure(self, key: str) -> None: ...
+
+    def reset(self, key: str) -> None: ...
+
+
+def _sliding_estimate(window_index: int, current: int, previous: int, now: float, window: float) -> float:
+    """Скользящее окно из двух счётчиков: текущего и предыдущего фиксированного окна."""
+    now_index = int(now // window)
+    if now_index == window_index:
+        weight = 1 - (now % window) / window
+        return previous * weight + current
+    if now_index == window_index + 1:
+        weight = 1 - (now % window) / window
+        return current * weight
+    return 0.0
+
+
+class _Counter:
+    __slots__ = ("window_index", "current", "previous")
+
+    def __init__(self, window_index: int) -> None:
+        self.window_index = window_index
+        self.current = 0
+        self.previous = 0
+
+
+class InMemoryAttemptLimiter:
+    """O(1) на ключ; ключи без попыток дольше двух окон вытесняет фоновая чистка.
+
+    Словарь упорядочен по последнему обращению, поэтому простаивающие ключи
+    всегда в начале и удаляются по одному за O(1). Активные ключи (с попытками
+    в окне) не вытесняются никогда: если таблица заполнена ими, неудачи по новым
+    ключам не записываются, но сами ключи не блокируются — иначе поток выдуманных
+    email закрыл бы вход всем остальным пользователям.
+    """
+
+    def __init__(self, limit: int, window_seconds: float, max_keys: int, sweep_interval_seconds: float = 1.0) -> None:
+        self.limit = limit
+        self.window = float(window_seconds)
+        self.max_keys = max_keys
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._counters: OrderedDict[str, tuple[_Counter, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        sweeper = threading.Thread(
+            target=_sweep_periodically, args=(weakref.ref(self), sweep_interval_seconds), daemon=True
+        )
+        sweeper.start()
+
+    def is_blocked(self, key: str) -> bool:
+        now = time.time()
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is None:
+                return False
+            counter = entry[0]
+            estimate = _sliding_estimate(counter.window_index, counter.current, counter.previous, now, self.window)
+            return estimate >= self.limit
+
+    def record_failure(self, key: str) -> None:
+        now = time.time()
+        now_index = int(now // self.window)
+        with self._lock:
+            entry = self._counters.pop(key, None)
+            if entry is None and self._is_full_locked(now):
+                return
+            counter = entry[0] if entry else _Counter(now_index)
+            if counter.window_index != now_index:
+                counter.previous = counter.current if now_index == counter.window_index + 1 else 0
+                counter.current = 0
+                counter.window_index = now_index
+            counter.current += 1
+            self._counters[key] = (counter, now)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+
+    def purge_idle(self) -> int:
+        with self._lock:
+            return self._purge_idle_locked(time.time())
+
+    @property
+    def saturated(self) -> bool:
+        with self._lock:
+            return self._is_full_locked(time.time())
+
+    def _is_full_locked(self, now: float) -> bool:
+        if len(self._counters) < self.max_keys:
+            return False
+        self._purge_idle_locked(now)
+        return len(self._counters) >= self.max_keys
+
+    def _purge_idle_locked(self, now: float) -> int:
+        idle_before = now - 2 * self.window
+        removed = 0
+        while self._counters:
+            _, (_, touched_at) = next(iter(self._counters.items()))
+            if touched_at > idle_before:
+                break
+            self._counters.popitem(last=False)
+            removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+
+def _sweep_periodically(limiter_ref: weakref.ref, interval: float) -> None:
+    while True:
+        time.sleep(interval)
+        limiter = limiter_ref()
+        if limiter is None:
+            return
+        limiter.purge_idle()
+        del limiter
+
+
+class SQLiteAttemptLimiter:
+    """Те же счётчики в локальном SQLite-файле, общем для воркеров одной машины."""
+
+    def __init__(self, path: str, limit: int, window_seconds: float, sweep_interval_seconds: float = 60.0) -> None:
+        self.limit = limit
+        self.window = float(window_seconds)
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS login_attempts ("
+            "key TEXT PRIMARY KEY, window_index INTEGER NOT NULL, current INTEGER NOT NULL, "
+            "previous INTEGER NOT NULL, touched_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_login_attempts_touched_at ON login_attempts (touched_at)")
+
+    def is_blocked(self, key: str) -> bool:
+        now = time.time()
+        with self._lock:
+            self._sweep(now)
+            row = self._conn.execute(
+                "SELECT window_index, current, previous FROM login_attempts WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return False
+        return _sliding_estimate(row[0], row[1], row[2], now, self.window) >= self.limit
+
+    def record_failure(self, key: str) -> None:
+        now = time.time()
+        now_index = int(now // self.window)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT window_index, current FROM login_attempts WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    current, previous = 1, 0
+                elif row[0] == now_index:
+                    current, previous = row[1] + 1, None
+                else:
+                    current, previous = 1, row[1] if now_index == row[0] + 1 else 0
+                if previous is None:
+                    self._conn.execute(
+                        "UPDATE login_attempts SET current = ?, touched_at = ? WHERE key = ?",
+                        (current, now, key),
+                    )
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO login_attempts (key, window_index, current, previous, touched_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, now_index, current, previous, now),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM login_attempts WHERE key = ?", (key,))
+
+    def _sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval_seconds
+        self._conn.execute("DELETE FROM login_attempts WHERE touched_at <= ?", (now - 2 * self.window,))
+
+
+def build_login_limiter() -> AttemptLimiter:
+    if settings.login_attempts_backend == "sqlite":
+        return SQLiteAttemptLimiter(
+            settings.login_attempts_sqlite_path,
+            limit=settings.login_attempts_limit,
+            window_seconds=settings.login_attempts_window_seconds,
+        )
+    return InMemoryAttemptLimiter(
+        limit=settings.login_attempts_limit,
+        window_seconds=settings.login_attempts_window_seconds,
+        max_keys=settings.login_attempts_max_keys,
+    )
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import cache_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _RouteStats:
+    __slots__ = ("statuses", "buckets", "total", "count")
+
+    def __init__(self) -> None:
+        self.statuses: dict[str, int] = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """Счётчики одного воркера.
+
+    Запись идёт только из потока event loop, поэтому блокировки не нужны;
+    каждый процесс uvicorn агрегирует свои значения независимо.
+    """
+
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], _RouteStats] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status_code: int, duration: float) -> None:
+        key = (method, route)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = _RouteStats()
+        status_class = f"{status_code // 100}xx"
+        stats.statuses[status_class] = stats.statuses.get(status_class, 0) + 1
+        stats.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        stats.total += duration
+        stats.count += 1
+
+    def reset(self) -> None:
+        self.routes.clear()
+        self.in_flight = 0
+
+    def render(self, engine: Any = None) -> str:
+        routes = sorted(self.routes.items())
+        lines = ["# TYPE http_requests_in_flight gauge", f"http_requests_in_flight {self.in_flight}"]
+
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route), stats in routes:
+            for status_class, count in sorted(stats.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{method="{method}",route="{route}",status="{status_class}"}} {count}'
+                )
+
+        lines.append("# TYPE http_request_duration_seconds histogram")
+        for (method, route), stats in routes:
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {stats.total:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {stats.count}")
+
+        if engine is not None:
+            lines.append("# TYPE db_pool_connections gauge")
+            for state in ("size", "checkedin", "checkedout", "overflow"):
+                getter = getattr(engine.pool, state, None)
+                if callable(getter):
+                    lines.append(f'db_pool_connections{{state="{state}"}} {getter()}')
+
+        caches = sorted(cache_stats().items())
+        for family, field, kind in (
+            ("cache_hits_total", "hits", "counter"),
+            ("cache_misses_total", "misses", "counter"),
+            ("cache_entries", "size", "gauge"),
+            ("cache_hit_ratio", "hit_ratio", "gauge"),
+        ):
+            lines.append(f"# TYPE {family} {kind}")
+            for name, stats in caches:
+                lines.append(f'{family}{{cache="{name}"}} {stats[field]}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        registry = self.registry
+        status_code = 500
+        registry.in_flight += 1
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            registry.in_flight -= 1
+            route = scope.get("route")
+            registry.observe(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - started,
+            )
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Protocol
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+
+
+class RevocationStore(Protocol):
+    def revoke(self, jti: str, expires_at: float) -> bool: ...
+
+    def is_revoked(self, jti: str) -> bool: ...
+
+    def purge_expired(self) -> int: ...
+
+
+class InMemoryRevocationStore:
+    """Отозванные jti живут в памяти только до истечения своего токена."""
+
+    def __init__(self) -> None:
+        self._expiry: dict[str, float] = {}
+        self._heap: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> bool:
+        """Отзывает jti; False, если он уже был отозван (повтор) или токен истёк."""
+        with self._lock:
+            now = time.time()
+            self._purge_locked(now)
+            if expires_at <= now or jti in self._expiry:
+                return False
+            self._expiry[jti] = expires_at
+            heapq.heappush(self._heap, (expires_at, jti))
+            return True
+
+    def is_revoked(self, jti: str) -> bool:
+        expires_at = self._expiry.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            return self._purge_locked(time.time())
+
+    def _purge_locked(self, now: float) -> int:
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._heap)
+            if self._expiry.get(jti) == expires_at:
+                del self._expiry[jti]
+                removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+
+class DatabaseRevocationStore:
+    """Таблица revoked_tokens, общая для всех воркеров."""
+
+    def __init__(self, engine: Engine, purge_interval_seconds: float = 60.0) -> None:
+        from app.models.revoked_token import RevokedToken
+
+        self.engine = engine
+        self.table = RevokedToken.__table__
+        self.purge_interval_seconds = purge_interval_seconds
+        self._next_purge = 0.0
+
+    def revoke(self, jti: str, expires_at: float) -> bool:
+        """Отзывает jti одним INSERT; False, если строка уже есть — его отозвал другой запрос или воркер."""
+        self._maybe_purge()
+        row = {"jti": jti, "expires_at": datetime.fromtimestamp(expires_at, tz=timezone.utc)}
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(self.table.insert().values(**row))
+        except IntegrityError:
+            return False
+        return True
+
+    def is_revoked(self, jti: str) -> bool:
+        now = datetime.now(timezone.utc)
+        with self.engine.connect() as conn:
+            found = conn.execute(
+                select(self.table.c.jti).where(self.table.c.jti == jti, self.table.c.expires_at > now)
+            ).first()
+        return found is not None
+
+    def purge_expired(self) -> int:
+        now = datetime.now(timezone.utc)
+        with self.engine.begin() as conn:
+            result = conn.execute(delete(self.table).where(self.table.c.expires_at <= now))
+        return result.rowcount or 0
+
+    def _maybe_purge(self) -> None:
+        now = time.monotonic()
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval_seconds
+            self.purge_expired()
+
+
+_store: RevocationStore | None = None
+
+
+def get_revocation_store() -> RevocationStore:
+    global _store
+    if _store is None:
+        if settings.token_revocation_backend == "database":
+            from app.db.session import engine
+
+            _store = DatabaseRevocationStore(engine)
+        else:
+            _store = InMemoryRevocationStore()
+    return _store
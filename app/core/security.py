@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime, timedelta
 from typing import Any
 from uuid import uuid4
@@ -8,16 +9,19 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
 
+from app.core.cache import ExpiringLRUCache
 from app.core.config import settings
+from app.core.revocation import get_revocation_store
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
-_revoked_refresh_tokens: set[str] = set()
+access_token_cache = ExpiringLRUCache("access_tokens", settings.access_token_cache_size)
 
 
 class TokenData(BaseModel):
     user_id: int
     role: str
     jti: str | None = None
+    exp: int | None = None
 
 
 def get_password_hash(password: str) -> str:
@@ -48,15 +52,22 @@ def create_refresh_token(data: dict[str, Any], expires_delta: timedelta | None =
 
 
 def decode_access_token(token: str) -> TokenData:
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = access_token_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         user_id = int(payload.get("sub"))
         role = payload.get("role")
         if user_id is None or role is None:
             raise JWTError()
-        return TokenData(user_id=user_id, role=role, jti=payload.get("jti"))
+        token_data = TokenData(user_id=user_id, role=role, jti=payload.get("jti"))
     except JWTError as exc:
         raise JWTError("Token invalid") from exc
+    if payload.get("exp") is not None:
+        access_token_cache.set(cache_key, token_data, float(payload["exp"]))
+    return token_data
 
 
 def decode_refresh_token(token: str) -> TokenData:
@@ -69,14 +80,15 @@ def decode_refresh_token(token: str) -> TokenData:
         jti = payload.get("jti")
         if user_id is None or role is None or jti is None:
             raise JWTError()
-        return TokenData(user_id=user_id, role=role, jti=jti)
+        return TokenData(user_id=user_id, role=role, jti=jti, exp=payload.get("exp"))
     except JWTError as exc:
         raise JWTError("Refresh token invalid") from exc
 
 
-def is_refresh_token_revoked(token: str) -> bool:
-    return token in _revoked_refresh_tokens
+def is_refresh_token_revoked(token_data: TokenData) -> bool:
+    return get_revocation_store().is_revoked(token_data.jti)
 
 
-def revoke_refresh_token(token: str) -> None:
-    _revoked_refresh_tokens.add(token)
+def revoke_refresh_token(token_data: TokenData) -> bool:
+    """True, если этот вызов отозвал токен; False — токен уже был отозван."""
+    return get_revocation_store().revoke(token_data.jti, float(token_data.exp))
@@ -3,4 +3,4 @@ from sqlalchemy.orm import declarative_base
 Base = declarative_base()
 
 # Импорты моделей необходимы, чтобы Alembic обнаруживал их
-from app.models import assignment, assignment_submission, course, enrollment, material, user  # noqa: F401
+from app.models import assignment, assignment_submission, course, enrollment, material, revoked_token, user  # noqa: F401
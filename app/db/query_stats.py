@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db")
+
+_current: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+_observers: list[Callable[[Scope, "QueryStats"], None]] = []
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    # Время старта живёт в контексте выполнения, а не в соединении: если запрос упал
+    # (IntegrityError и т. п.), after-хук не вызывается и на соединении ничего не остаётся.
+    if _current.get() is not None and context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    if stats is None:
+        return
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        stats.duration += time.perf_counter() - started
+    stats.count += 1
+    stats.shapes[statement] += 1
+    if stats.shapes[statement] == settings.n_plus_one_threshold + 1:
+        logger.warning(
+            "Statement repeated more than %s times in one request (possible N+1): %s",
+            settings.n_plus_one_threshold,
+            " ".join(statement.split())[:200],
+        )
+
+
+def install_query_counter(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def add_observer(observer: Callable[[Scope, QueryStats], None]) -> None:
+    _observers.append(observer)
+
+
+def remove_observer(observer: Callable[[Scope, QueryStats], None]) -> None:
+    _observers.remove(observer)
+
+
+class QueryStatsMiddleware:
+    """Считает SQL-запросы и время БД за запрос; в DEBUG добавляет X-DB-Queries и X-DB-Time."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as stats:
+
+            async def send_with_headers(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.debug:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-db-queries", str(stats.count).encode()),
+                        (b"x-db-time", f"{stats.duration * 1000:.2f}ms".encode()),
+                    ]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                for observer in _observers:
+                    observer(scope, stats)
@@ -1,15 +1,32 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.query_stats import install_query_counter
+
+
+def _enable_foreign_keys(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def enable_sqlite_foreign_keys(engine: Engine) -> None:
+    """SQLite по умолчанию не проверяет внешние ключи и не выполняет ondelete="CASCADE"."""
+    if engine.dialect.name == "sqlite" and not event.contains(engine, "connect", _enable_foreign_keys):
+        event.listen(engine, "connect", _enable_foreign_keys)
+
 
 engine = create_engine(
     settings.database_url,
     future=True,
     pool_pre_ping=True,
 )
+install_query_counter(engine)
+enable_sqlite_foreign_keys(engine)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
 
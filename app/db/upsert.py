@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def insert_ignoring_conflicts(db: Session, model, index_elements: list[str]):
+    """INSERT ... ON CONFLICT (index_elements) DO NOTHING для PostgreSQL и SQLite."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    # Недостижимо: Settings отклоняет другие СУБД при старте (SUPPORTED_DATABASES).
+    raise RuntimeError(f"Unsupported database dialect: {dialect}")
@@ -1,66 +1,220 @@
 from __future__ import annotations
 
+import json
 import logging
+import math
 import time
-from collections import deque
-from typing import Deque
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Mapping, Sequence
 
-from fastapi import HTTPException, Request, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from fastapi import status
+from starlette.exceptions import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.config import settings
 
 logger = logging.getLogger("app.middleware")
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp) -> None:
-        super().__init__(app)
-        self.history: dict[str, Deque[float]] = {}
+def _get_header(scope: Scope, name: bytes) -> bytes | None:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
 
-    async def dispatch(self, request: Request, call_next):
-        client = request.client.host if request.client else "unknown"
+
+async def _send_error(
+    send: Send,
+    status_code: int,
+    detail: str,
+    headers: Sequence[tuple[bytes, bytes]] = (),
+) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """Правило для префикса пути.
+
+    Без собственных requests/window_seconds правило списывает `cost` токенов
+    из общего ведра клиента, иначе у клиента для префикса отдельное ведро.
+    """
+
+    path_prefix: str
+    cost: int = 1
+    requests: int | None = None
+    window_seconds: float | None = None
+
+
+class RateLimitMiddleware:
+    """Token bucket на клиента (IP) в виде чистого ASGI middleware.
+
+    Таблица ведер ограничена `max_clients`, самые давно неактивные клиенты вытесняются.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests: int | None = None,
+        window_seconds: float | None = None,
+        rules: Sequence[RateLimitRule] = (),
+        max_clients: int | None = None,
+    ) -> None:
+        self.app = app
+        self.default_rule = RateLimitRule(
+            "",
+            requests=requests or settings.rate_limit_requests,
+            window_seconds=window_seconds or settings.rate_limit_window_seconds,
+        )
+        self.rules = sorted(rules, key=lambda rule: len(rule.path_prefix), reverse=True)
+        self.max_clients = max_clients or settings.rate_limit_max_clients
+        self.buckets: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+
+    def _match(self, path: str) -> tuple[RateLimitRule, int]:
+        for rule in self.rules:
+            if path.startswith(rule.path_prefix):
+                if rule.requests is None:
+                    return self.default_rule, rule.cost
+                return rule, rule.cost
+        return self.default_rule, 1
+
+    def _take(self, key: tuple[str, str], rule: RateLimitRule, cost: int) -> tuple[bool, float, float]:
+        capacity = float(rule.requests)
+        rate = capacity / float(rule.window_seconds)
         now = time.monotonic()
-        limit = settings.rate_limit_requests
-        window = settings.rate_limit_window_seconds
-        timestamps = self.history.setdefault(client, deque())
-        while timestamps and now - timestamps[0] > window:
-            timestamps.popleft()
-        if len(timestamps) >= limit:
-            return JSONResponse(
-                {"detail": "Rate limit exceeded"},
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            )
-        timestamps.append(now)
-        response = await call_next(request)
-        return response
-
-
-class RequestSizeLimitMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        header = request.headers.get("content-length")
-        max_size = getattr(settings, "max_request_size", 0)
-        if header and header.isdigit():
-            if int(header) > max_size and max_size > 0:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail="Request body too large",
-                )
-        return await call_next(request)
-
-
-class HTTPSRedirectMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if not settings.require_https:
-            return await call_next(request)
-        forwarded_proto = request.headers.get("x-forwarded-proto", "")
-        scheme = request.url.scheme or ""
-        if forwarded_proto.lower() != "https" and scheme.lower() != "https":
-            logger.warning("Rejected non-HTTPS request from %s", request.client)
-            raise HTTPException(
-                status_code=status.HTTP_426_UPGRADE_REQUIRED,
-                detail="HTTPS required",
+        bucket = self.buckets.pop(key, None)
+        if bucket is None:
+            tokens = capacity
+        else:
+            tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self.buckets[key] = [tokens, now]
+        if len(self.buckets) > self.max_clients:
+            self.buckets.popitem(last=False)
+        return allowed, tokens, rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        client = scope.get("client")
+        host = client[0] if client else "unknown"
+        rule, cost = self._match(scope["path"])
+        allowed, tokens, rate = self._take((host, rule.path_prefix), rule, cost)
+        headers = [
+            (b"x-ratelimit-limit", str(rule.requests).encode()),
+            (b"x-ratelimit-remaining", str(int(tokens)).encode()),
+            (b"x-ratelimit-reset", str(math.ceil((rule.requests - tokens) / rate)).encode()),
+        ]
+        if not allowed:
+            retry_after = str(math.ceil((cost - tokens) / rate)).encode()
+            await _send_error(
+                send,
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Rate limit exceeded",
+                [(b"retry-after", retry_after), *headers],
             )
-        return await call_next(request)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+class RequestBodyTooLarge(HTTPException):
+    def __init__(self) -> None:
+        super().__init__(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Request body too large")
+
+
+class RequestSizeLimitMiddleware:
+    """Лимит тела запроса, который проверяется по мере чтения `receive`.
+
+    Заголовок content-length отсекает запрос сразу, а chunked или заниженный
+    content-length прерываются с 413, как только превышен бюджет байтов.
+    `limits` задаёт свой лимит для префикса пути (самый длинный префикс выигрывает).
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int | None = None, limits: Mapping[str, int] | None = None) -> None:
+        self.app = app
+        self.max_size = settings.max_request_size if max_size is None else max_size
+        self.limits = sorted((limits or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _limit_for(self, path: str) -> int:
+        for prefix, limit in self.limits:
+            if path.startswith(prefix):
+                return limit
+        return self.max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_size = self._limit_for(scope["path"])
+        if max_size <= 0:
+            await self.app(scope, receive, send)
+            return
+        header = _get_header(scope, b"content-length")
+        if header is not None and header.isdigit() and int(header) > max_size:
+            await _send_error(send, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_size:
+                    raise RequestBodyTooLarge()
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            if response_started:
+                raise
+            await _send_error(send, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+
+
+class HTTPSRedirectMiddleware:
+    def __init__(self, app: ASGIApp, require_https: bool | None = None) -> None:
+        self.app = app
+        self.require_https = settings.require_https if require_https is None else require_https
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.require_https:
+            await self.app(scope, receive, send)
+            return
+        forwarded_proto = (_get_header(scope, b"x-forwarded-proto") or b"").lower()
+        scheme = scope.get("scheme", "").lower()
+        if forwarded_proto != b"https" and scheme != "https":
+            logger.warning("Rejected non-HTTPS request from %s", scope.get("client"))
+            await _send_error(send, status.HTTP_426_UPGRADE_REQUIRED, "HTTPS required")
+            return
+        await self.app(scope, receive, send)
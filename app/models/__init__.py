@@ -3,6 +3,7 @@ from app.models.assignment_submission import AssignmentSubmission
 from app.models.course import Course
 from app.models.enrollment import Enrollment
 from app.models.material import Material
+from app.models.revoked_token import RevokedToken
 from app.models.user import User
 
-__all__ = ["Assignment", "AssignmentSubmission", "Course", "Enrollment", "Material", "User"]
+__all__ = ["Assignment", "AssignmentSubmission", "Course", "Enrollment", "Material", "RevokedToken", "User"]
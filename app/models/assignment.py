@@ -18,4 +18,6 @@ class Assignment(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     course = relationship("Course", back_populates="assignments")
-    submissions = relationship("AssignmentSubmission", back_populates="assignment", cascade="all, delete-orphan")
+    submissions = relationship(
+        "AssignmentSubmission", back_populates="assignment", cascade="all, delete-orphan", passive_deletes=True
+    )
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, func
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -10,11 +12,28 @@ class AssignmentSubmission(Base):
     __tablename__ = "assignment_submissions"
 
     id = Column(Integer, primary_key=True, index=True)
-    assignment_id = Column(Integer, ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    assignment_id = Column(Integer, ForeignKey("assignments.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     message = Column(Text, nullable=False)
     link = Column(String(512), nullable=True)
-    submitted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Idempotency-Key клиента: повтор с тем же ключом не создаёт второе решение.
+    idempotency_key = Column(String(100), nullable=True)
+    # Значение задаётся в Python, чтобы формат совпадал с параметрами keyset-курсора и в SQLite.
+    submitted_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
 
     assignment = relationship("Assignment", back_populates="submissions")
     user = relationship("User", back_populates="submissions")
+
+    # Лента решений: keyset по (submitted_at, id) целиком и внутри фильтра по заданию или студенту.
+    # Составные индексы заменяют прежние одиночные по assignment_id и user_id.
+    __table_args__ = (
+        Index("ix_assignment_submissions_submitted_at_id", "submitted_at", "id"),
+        Index("ix_assignment_submissions_assignment_submitted", "assignment_id", "submitted_at", "id"),
+        Index("ix_assignment_submissions_user_submitted", "user_id", "submitted_at", "id"),
+        Index("uq_assignment_submissions_user_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
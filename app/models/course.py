@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from enum import Enum as PyEnum
 
-from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text, false, func
+from sqlalchemy.orm import relationship, validates
 
 from app.db.base import Base
 
 
+def normalize_title(title: str) -> str:
+    return title.strip().lower()
+
+
+def _title_normalized_default(context) -> str:
+    return normalize_title(context.get_current_parameters()["title"])
+
+
 class CourseLevel(str, PyEnum):
     beginner = "beginner"
     intermediate = "intermediate"
@@ -19,6 +28,8 @@ class Course(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(200), nullable=False, unique=True, index=True)
+    # Уникальность названия без учёта регистра проверяет сама БД при INSERT/UPDATE.
+    title_normalized = Column(String(200), nullable=False, unique=True, index=True, default=_title_normalized_default)
     description = Column(Text, nullable=True)
     level = Column(
         Enum(CourseLevel, name="courselevel"),
@@ -28,11 +39,29 @@ class Course(Base):
     )
     duration_minutes = Column(Integer, nullable=True)
     is_published = Column(Boolean, default=False, nullable=False, index=True)
+    students_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Курс скрыт и ждёт фонового удаления (purge_course); незавершённое удаление подхватывает
+    # python -m app.commands purge-deleted-courses.
+    pending_delete = Column(Boolean, nullable=False, default=False, server_default=false())
     created_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Значение задаётся в Python, чтобы формат совпадал с параметрами keyset-курсора и в SQLite.
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     creator = relationship("User", back_populates="courses_created")
-    enrollments = relationship("Enrollment", back_populates="course", cascade="all, delete-orphan")
-    materials = relationship("Material", back_populates="course", cascade="all, delete-orphan")
-    assignments = relationship("Assignment", back_populates="course", cascade="all, delete-orphan")
+    # Дочерние строки удаляет сама БД (ondelete="CASCADE"), ORM не загружает их перед удалением курса.
+    enrollments = relationship("Enrollment", back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
+    materials = relationship("Material", back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
+    assignments = relationship("Assignment", back_populates="course", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (Index("ix_courses_created_at_id", "created_at", "id"),)
+
+    @validates("title")
+    def _sync_title_normalized(self, key: str, title: str) -> str:
+        self.title_normalized = normalize_title(title)
+        return title
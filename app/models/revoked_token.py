@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, String
+
+from app.db.base import Base
+
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String(64), primary_key=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
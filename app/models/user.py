@@ -3,11 +3,19 @@ from __future__ import annotations
 from enum import Enum as PyEnum
 
 from sqlalchemy import Column, DateTime, Enum, Integer, String, func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 from app.db.base import Base
 
 
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def _email_normalized_default(context) -> str:
+    return normalize_email(context.get_current_parameters()["email"])
+
+
 class UserRole(str, PyEnum):
     admin = "admin"
     student = "student"
@@ -18,12 +26,25 @@ class User(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), nullable=False, unique=True, index=True)
+    # Ключ поиска при логине и регистрации: обычный уникальный индекс вместо скана по lower(email).
+    email_normalized = Column(String(255), nullable=False, unique=True, index=True, default=_email_normalized_default)
     hashed_password = Column(String(255), nullable=False)
     full_name = Column(String(255), nullable=True)
     role = Column(Enum(UserRole), nullable=False, default=UserRole.student)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    courses_created = relationship("Course", back_populates="creator", cascade="all, delete-orphan")
-    enrollments = relationship("Enrollment", back_populates="user", cascade="all, delete-orphan")
-    submissions = relationship("AssignmentSubmission", back_populates="user", cascade="all, delete-orphan")
+    courses_created = relationship(
+        "Course", back_populates="creator", cascade="all, delete-orphan", passive_deletes=True
+    )
+    # Записи удаляет каскад БД, поэтому courses.students_count при удалении пользователя уменьшает
+    # before_delete-хук в user_service. Массовый delete(User) его обходит: после него нужен repair-students-count.
+    enrollments = relationship("Enrollment", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    submissions = relationship(
+        "AssignmentSubmission", back_populates="user", cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    @validates("email")
+    def _sync_email_normalized(self, key: str, email: str) -> str:
+        self.email_normalized = normalize_email(email)
+        return email
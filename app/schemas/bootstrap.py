@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+from app.schemas.assignment import AssignmentResponse
+from app.schemas.enrollment import EnrollmentResponse
+from app.schemas.pagination import CursorPaginatedSubmissionOverview, PaginatedCourses
+from app.schemas.user import UserResponse
+
+
+class BootstrapResponse(BaseModel):
+    user: UserResponse
+    courses: PaginatedCourses
+    enrollments: list[EnrollmentResponse]
+    assignments: list[AssignmentResponse]
+    admin_overview: CursorPaginatedSubmissionOverview | None = None
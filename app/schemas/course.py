@@ -1,8 +1,13 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
 from app.models.course import CourseLevel
+from app.schemas.assignment import AssignmentResponse
+from app.schemas.assignment_submission import AssignmentSubmissionResponse
+from app.schemas.enrollment import EnrollmentResponse
+from app.schemas.material import MaterialResponse
 
 
 class CourseBase(BaseModel):
@@ -55,6 +60,23 @@ class CourseResponse(BaseModel):
     duration_minutes: int | None
 
 
+class CourseAssignmentStatus(AssignmentResponse):
+    submission_status: Literal["submitted", "not_submitted"]
+    latest_submission: AssignmentSubmissionResponse | None
+
+
+class CourseFullResponse(BaseModel):
+    course: CourseResponse
+    materials: list[MaterialResponse]
+    assignments: list[CourseAssignmentStatus]
+    enrollment: EnrollmentResponse | None
+
+
+class CourseSuggestion(BaseModel):
+    id: int
+    title: str
+
+
 class CourseLevelInfo(BaseModel):
     value: CourseLevel
     label: str
@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, root_validator
+
+BULK_ENROLLMENT_LIMIT = 10000
 
 
 class EnrollmentResponse(BaseModel):
@@ -11,3 +14,30 @@ class EnrollmentResponse(BaseModel):
     user_id: int
     course_id: int
     enrolled_at: datetime
+
+
+class BulkEnrollmentRequest(BaseModel):
+    user_ids: list[int] = Field(default_factory=list, max_items=BULK_ENROLLMENT_LIMIT)
+    emails: list[str] = Field(default_factory=list, max_items=BULK_ENROLLMENT_LIMIT)
+
+    @root_validator
+    def ensure_bounded(cls, values):
+        total = len(values.get("user_ids") or []) + len(values.get("emails") or [])
+        if total == 0:
+            raise ValueError("Нужен хотя бы один user_id или email")
+        if total > BULK_ENROLLMENT_LIMIT:
+            raise ValueError(f"Не больше {BULK_ENROLLMENT_LIMIT} пользователей за запрос")
+        return values
+
+
+class BulkEnrollmentResult(BaseModel):
+    user_id: int | None = None
+    email: str | None = None
+    status: Literal["enrolled", "already_enrolled", "not_found", "not_student", "duplicate"]
+
+
+class BulkEnrollmentResponse(BaseModel):
+    course_id: int
+    enrolled: int
+    already_enrolled: int
+    results: list[BulkEnrollmentResult]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 
+from app.schemas.assignment_submission import AssignmentSubmissionOverview
 from app.schemas.course import CourseResponse
 
 
@@ -11,3 +12,16 @@ class PaginatedCourses(BaseModel):
     total: int
     skip: int
     limit: int
+
+
+class CursorPaginatedCourses(BaseModel):
+    items: list[CourseResponse]
+    next_cursor: str | None
+    limit: int
+    total: int | None = None
+
+
+class CursorPaginatedSubmissionOverview(BaseModel):
+    items: list[AssignmentSubmissionOverview]
+    next_cursor: str | None
+    limit: int
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.models.assignment import Assignment
@@ -23,20 +24,15 @@ def list_assignments_for_course(db: Session, course_id: int) -> list[Assignment]
     )
 
 
-def list_assignments_for_user(db: Session, user) -> list[Assignment]:
-    if user.role == UserRole.admin:
-        return db.query(Assignment).order_by(Assignment.due_date.asc().nulls_last(), Assignment.created_at.desc()).all()
-    course_ids = (
-        db.query(Enrollment.course_id)
-        .filter(Enrollment.user_id == user.id)
-        .subquery()
-    )
-    return (
-        db.query(Assignment)
-        .filter(Assignment.course_id.in_(course_ids))
-        .order_by(Assignment.due_date.asc().nulls_last(), Assignment.created_at.desc())
-        .all()
-    )
+def list_assignments_for_user(db: Session, user, limit: int | None = None) -> list[Assignment]:
+    query = db.query(Assignment)
+    if user.role != UserRole.admin:
+        course_ids = select(Enrollment.course_id).where(Enrollment.user_id == user.id)
+        query = query.filter(Assignment.course_id.in_(course_ids))
+    query = query.order_by(Assignment.due_date.asc().nulls_last(), Assignment.created_at.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 
 def create_assignment(db: Session, course: Course, payload: AssignmentCreate) -> Assignment:
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from typing import Iterator
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, String, Text, literal, select, tuple_
 from sqlalchemy.orm import Session
 
+from app.db.upsert import insert_ignoring_conflicts
 from app.models.assignment import Assignment
 from app.models.assignment_submission import AssignmentSubmission
 from app.models.course import Course
 from app.models.enrollment import Enrollment
 from app.models.user import User
-from app.schemas.assignment_submission import AssignmentSubmissionCreate
+from app.schemas.assignment_submission import AssignmentSubmissionCreate, AssignmentSubmissionOverview
+from app.services.export_service import ExportFormat, export_rows
+from app.utils.cursor import decode_keyset_cursor, encode_keyset_cursor
+from app.utils.exceptions import client_error
 
 
 def get_submission(db: Session, assignment_id: int, user_id: int) -> AssignmentSubmission | None:
@@ -40,41 +49,208 @@ def list_submissions_for_user(db: Session, user_id: int) -> list[AssignmentSubmi
     )
 
 
-def list_submission_overview(db: Session):
-    return (
-        db.query(AssignmentSubmission, Assignment, Course, User)
+def latest_submissions_for_course(db: Session, user_id: int, course_id: int) -> dict[int, AssignmentSubmission]:
+    """Последнее решение пользователя по каждому заданию курса, одним запросом."""
+    submissions = (
+        db.query(AssignmentSubmission)
+        .join(Assignment, AssignmentSubmission.assignment_id == Assignment.id)
+        .filter(Assignment.course_id == course_id, AssignmentSubmission.user_id == user_id)
+        .order_by(AssignmentSubmission.submitted_at.desc(), AssignmentSubmission.id.desc())
+        .all()
+    )
+    latest: dict[int, AssignmentSubmission] = {}
+    for submission in submissions:
+        latest.setdefault(submission.assignment_id, submission)
+    return latest
+
+
+def _overview_select(
+    course_id: int | None = None,
+    assignment_id: int | None = None,
+    student_id: int | None = None,
+    submitted_from: datetime | None = None,
+    submitted_to: datetime | None = None,
+):
+    # Только нужные колонки: строки не превращаются в ORM-объекты и не попадают в identity map.
+    statement = (
+        select(
+            AssignmentSubmission.id.label("submission_id"),
+            Assignment.id.label("assignment_id"),
+            Assignment.title.label("assignment_title"),
+            Course.id.label("course_id"),
+            Course.title.label("course_title"),
+            User.id.label("student_id"),
+            User.email.label("student_email"),
+            AssignmentSubmission.message,
+            AssignmentSubmission.link,
+            AssignmentSubmission.submitted_at,
+        )
         .join(Assignment, AssignmentSubmission.assignment_id == Assignment.id)
         .join(Course, Assignment.course_id == Course.id)
         .join(User, AssignmentSubmission.user_id == User.id)
-        .order_by(AssignmentSubmission.submitted_at.desc())
-        .all()
     )
+    if course_id is not None:
+        statement = statement.where(Assignment.course_id == course_id)
+    if assignment_id is not None:
+        statement = statement.where(AssignmentSubmission.assignment_id == assignment_id)
+    if student_id is not None:
+        statement = statement.where(AssignmentSubmission.user_id == student_id)
+    if submitted_from is not None:
+        statement = statement.where(AssignmentSubmission.submitted_at >= submitted_from)
+    if submitted_to is not None:
+        statement = statement.where(AssignmentSubmission.submitted_at < submitted_to)
+    return statement.order_by(AssignmentSubmission.submitted_at.desc(), AssignmentSubmission.id.desc())
 
 
-def _ensure_enrolled(db: Session, user_id: int, course_id: int) -> bool:
+def list_submission_overview_page(
+    db: Session,
+    cursor: str | None = None,
+    limit: int = 50,
+    **filters,
+) -> tuple[list[AssignmentSubmissionOverview], str | None]:
+    """Страница ленты решений (новые сверху) после курсора (submitted_at, id).
+
+    Фильтры: course_id, assignment_id, student_id, submitted_from (включительно), submitted_to (исключая).
+    """
+    statement = _overview_select(**filters)
+    if cursor:
+        submitted_at, submission_id = decode_keyset_cursor(cursor)
+        statement = statement.where(
+            tuple_(AssignmentSubmission.submitted_at, AssignmentSubmission.id) < tuple_(submitted_at, submission_id)
+        )
+    rows = db.execute(statement.limit(limit + 1)).all()
+    items = [AssignmentSubmissionOverview(**row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_keyset_cursor(last.submitted_at, last.submission_id)
+    return items, next_cursor
+
+
+def export_submission_overview(db: Session, format: ExportFormat, **filters) -> Iterator[bytes]:
+    """Вся отфильтрованная лента решений потоком, в том же порядке и с теми же колонками, что и страницы."""
+    return export_rows(db, _overview_select(**filters), format)
+
+
+def _enrolled_in_assignment_course(user_id: int):
     return (
-        db.query(Enrollment)
-        .filter(Enrollment.user_id == user_id, Enrollment.course_id == course_id)
+        select(Enrollment.id)
+        .where(Enrollment.user_id == user_id, Enrollment.course_id == Assignment.course_id)
+        .exists()
+    )
+
+
+def _find_replay(
+    db: Session,
+    user_id: int,
+    assignment_id: int,
+    payload: AssignmentSubmissionCreate,
+    idempotency_key: str,
+) -> AssignmentSubmission | None:
+    previous = (
+        db.query(AssignmentSubmission)
+        .filter(AssignmentSubmission.user_id == user_id, AssignmentSubmission.idempotency_key == idempotency_key)
         .first()
-        is not None
     )
+    link = str(payload.link) if payload.link else None
+    if previous is not None and (
+        previous.assignment_id != assignment_id or previous.message != payload.message or previous.link != link
+    ):
+        raise client_error(
+            "IDEMPOTENCY_KEY_REUSED",
+            "Ключ идемпотентности уже использован для другого решения",
+            field="Idempotency-Key",
+            status_code=409,
+        )
+    return previous
+
+
+def _raise_rejected(db: Session, assignment_id: int) -> None:
+    if db.query(Assignment.id).filter(Assignment.id == assignment_id).first() is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задание не найдено")
+    raise ValueError("Student is not enrolled in the assignment course")
 
 
 def create_submission(
     db: Session,
     user_id: int,
-    assignment: Assignment,
+    assignment_id: int,
     payload: AssignmentSubmissionCreate,
-) -> AssignmentSubmission:
-    if not _ensure_enrolled(db, user_id, assignment.course_id):
-        raise ValueError("Student is not enrolled in the assignment course")
-    submission = AssignmentSubmission(
-        assignment_id=assignment.id,
-        user_id=user_id,
-        message=payload.message,
-        link=str(payload.link) if payload.link else None,
+    idempotency_key: str | None = None,
+):
+    """Решение одним INSERT ... SELECT ... WHERE EXISTS(запись на курс задания) RETURNING.
+
+    С idempotency_key повтор не вставляет строку (ON CONFLICT по (user_id, idempotency_key))
+    и возвращает ранее сохранённое решение; тот же ключ с другим заданием, текстом или ссылкой — 409. Если строка не вставлена и повтора нет,
+    отдельный запрос различает отсутствующее задание (404) и отсутствие записи на курс (ValueError).
+    """
+    source = select(
+        Assignment.id,
+        literal(user_id),
+        literal(payload.message, Text),
+        literal(str(payload.link) if payload.link else None, String),
+        literal(datetime.now(timezone.utc), DateTime(timezone=True)),
+        literal(idempotency_key, String),
+    ).where(Assignment.id == assignment_id, _enrolled_in_assignment_course(user_id))
+    statement = (
+        insert_ignoring_conflicts(db, AssignmentSubmission, ["user_id", "idempotency_key"])
+        .from_select(["assignment_id", "user_id", "message", "link", "submitted_at", "idempotency_key"], source)
+        .returning(
+            AssignmentSubmission.id,
+            AssignmentSubmission.assignment_id,
+            AssignmentSubmission.user_id,
+            AssignmentSubmission.message,
+            AssignmentSubmission.link,
+            AssignmentSubmission.submitted_at,
+        )
     )
-    db.add(submission)
-    db.commit()
-    db.refresh(submission)
-    return submission
+    submission = db.execute(statement).first()
+    if submission is not None:
+        db.commit()
+        return submission
+    if idempotency_key is not None:
+        previous = _find_replay(db, user_id, assignment_id, payload, idempotency_key)
+        if previous is not None:
+            return previous
+    _raise_rejected(db, assignment_id)
+
+
+def validate_submission(
+    db: Session,
+    user_id: int,
+    assignment_id: int,
+    payload: AssignmentSubmissionCreate,
+    idempotency_key: str | None = None,
+) -> AssignmentSubmission | None:
+    """Проверки перед групповой записью (SUBMISSION_INGEST_MODE=batched) без вставки.
+
+    Возвращает ранее сохранённое решение для повтора с тем же ключом, иначе None — решение можно
+    ставить в очередь. Ошибки те же, что у create_submission.
+    """
+    if idempotency_key is not None:
+        previous = _find_replay(db, user_id, assignment_id, payload, idempotency_key)
+        if previous is not None:
+            return previous
+    row = db.execute(
+        select(Assignment.id, _enrolled_in_assignment_course(user_id)).where(Assignment.id == assignment_id)
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Задание не найдено")
+    if not row[1]:
+        raise ValueError("Student is not enrolled in the assignment course")
+    return None
+
+
+def submission_values(
+    user_id: int,
+    assignment_id: int,
+    payload: AssignmentSubmissionCreate,
+    idempotency_key: str | None = None,
+) -> dict:
+    return {
+        "assignment_id": assignment_id,
+        "user_id": user_id,
+        "message": payload.message,
+        "link": str(payload.link) if payload.link else None,
+        "idempotency_key": idempotency_key,
+    }
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import itertools
+import time
+from typing import Hashable
+
+from app.core.cache import ExpiringLRUCache
+from app.core.config import settings
+
+# Готовые JSON-ответы GET /courses для не-админов.
+# Версия каталога входит в ключ: после записи старые страницы просто перестают
+# находиться и вытесняются по LRU/TTL. Страница, посчитанная во время записи,
+# сохраняется под старой версией и тоже не будет отдана.
+catalog_cache = ExpiringLRUCache("course_catalog", settings.course_catalog_cache_size)
+_versions = itertools.count(1)
+_version = next(_versions)
+
+
+def bump_catalog_version() -> None:
+    global _version
+    _version = next(_versions)
+
+
+def catalog_key(*parts: Hashable) -> tuple:
+    return (_version, *parts)
+
+
+def role_class(user) -> str:
+    return user.role.value if user else "anonymous"
+
+
+def get_catalog_page(key: tuple) -> bytes | None:
+    return catalog_cache.get(key)
+
+
+def store_catalog_page(key: tuple, body: bytes) -> None:
+    catalog_cache.set(key, body, time.time() + settings.course_catalog_cache_ttl_seconds)
@@ -1,26 +1,39 @@
 from __future__ import annotations
 
-from sqlalchemy import func
+import logging
+from datetime import datetime
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.assignment import Assignment
+from app.models.assignment_submission import AssignmentSubmission
 from app.models.course import Course
 from app.models.enrollment import Enrollment
 from app.schemas.course import CourseCreate, CourseUpdate
+from app.services.catalog_cache import bump_catalog_version
+from app.services.course_suggest import title_index
+from app.services.search_service import apply_search, index_course, remove_course_from_index
+from app.utils.cursor import decode_keyset_cursor, encode_keyset_cursor
 from app.utils.exceptions import client_error
 
+logger = logging.getLogger("app.courses")
+
 
-def _apply_course_filters(query, search: str | None, published_only: bool, is_published: bool | None):
+def _apply_course_filters(db: Session, query, search: str | None, published_only: bool, is_published: bool | None):
+    query = query.filter(Course.pending_delete.is_(False))
     if published_only:
         query = query.filter(Course.is_published.is_(True))
     elif is_published is not None:
         query = query.filter(Course.is_published == is_published)
+    rank = None
     if search:
-        pattern = f"%{search}%"
-        query = query.filter(
-            Course.title.ilike(pattern) | Course.description.ilike(pattern)
-        )
-    return query
+        query, rank = apply_search(query, db, search)
+    return query, rank
 
 
 def list_courses(
@@ -30,38 +43,83 @@ def list_courses(
     search: str | None = None,
     published_only: bool = True,
     is_published: bool | None = None,
-) -> tuple[list[tuple[Course, int]], int]:
+) -> tuple[list[Course], int]:
     limit = min(limit, 100)
-    query = db.query(Course)
-    query = _apply_course_filters(query, search, published_only, is_published)
+    query, rank = _apply_course_filters(db, db.query(Course), search, published_only, is_published)
     total = query.count()
-
-    aggregated_query = (
-        query
-        .outerjoin(Enrollment)
-        .with_entities(Course, func.count(Enrollment.id).label("students_count"))
-        .group_by(Course.id)
-        .order_by(Course.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
-    items = aggregated_query.all()
+    ordering = [Course.created_at.desc()] if rank is None else [rank, Course.created_at.desc()]
+    items = query.order_by(*ordering).offset(skip).limit(limit).all()
     return items, total
 
 
+def encode_course_cursor(course: Course) -> str:
+    return encode_keyset_cursor(course.created_at, course.id)
+
+
+def decode_course_cursor(cursor: str) -> tuple[datetime, int]:
+    return decode_keyset_cursor(cursor)
+
+
+def list_courses_keyset(
+    db: Session,
+    cursor: str | None = None,
+    limit: int = 10,
+    search: str | None = None,
+    published_only: bool = True,
+    is_published: bool | None = None,
+    with_total: bool = False,
+) -> tuple[list[Course], str | None, int | None]:
+    """Страница каталога после курсора (created_at, id) без OFFSET; total считается только по запросу.
+
+    Поиск здесь только фильтрует: порядок остаётся по (created_at, id), иначе курсор не работает.
+    """
+    limit = min(limit, 100)
+    query, _ = _apply_course_filters(db, db.query(Course), search, published_only, is_published)
+    total = query.count() if with_total else None
+    if cursor:
+        created_at, course_id = decode_course_cursor(cursor)
+        query = query.filter(tuple_(Course.created_at, Course.id) < tuple_(created_at, course_id))
+    rows = query.order_by(Course.created_at.desc(), Course.id.desc()).limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = encode_course_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor, total
+
+
 def get_course(db: Session, course_id: int) -> Course | None:
-    return db.query(Course).filter(Course.id == course_id).first()
+    return db.query(Course).filter(Course.id == course_id, Course.pending_delete.is_(False)).first()
 
 
-def create_course(db: Session, course_create: CourseCreate, creator_id: int) -> Course:
-    existing = (
-        db.query(Course)
-        .filter(func.lower(Course.title) == course_create.title.lower())
-        .first()
+# Уникальные ограничения на название: индекс из 0012, ограничение из 0001 и индекс из create_all.
+_TITLE_CONSTRAINTS = ("ix_courses_title_normalized", "courses_title_key", "ix_courses_title")
+_TITLE_COLUMNS = ("courses.title_normalized", "courses.title")
+
+
+def _is_title_conflict(exc: IntegrityError) -> bool:
+    diag = getattr(exc.orig, "diag", None)
+    if diag is not None:
+        return diag.constraint_name in _TITLE_CONSTRAINTS
+    # SQLite не отдаёт имя ограничения, только список колонок: "UNIQUE constraint failed: courses.title_normalized".
+    prefix = "UNIQUE constraint failed: "
+    message = str(exc.orig)
+    return message.startswith(prefix) and any(
+        column in _TITLE_COLUMNS for column in message[len(prefix) :].split(", ")
     )
-    if existing:
-        raise client_error("COURSE_EXISTS", "Курс с таким названием уже существует", field="title", status_code=400)
 
+
+def _flush_course(db: Session) -> None:
+    """Дубликат названия (без учёта регистра) ловит уникальный индекс на title_normalized при INSERT/UPDATE."""
+    try:
+        db.flush()
+    except IntegrityError as exc:
+        db.rollback()
+        if _is_title_conflict(exc):
+            raise client_error(
+                "COURSE_EXISTS", "Курс с таким названием уже существует", field="title", status_code=400
+            ) from exc
+        raise
+
+
+def create_course(db: Session, course_create: CourseCreate, creator_id: int) -> Course:
     course = Course(
         title=course_create.title,
         description=course_create.description,
@@ -70,20 +128,17 @@ def create_course(db: Session, course_create: CourseCreate, creator_id: int) ->
         created_by=creator_id,
     )
     db.add(course)
+    _flush_course(db)
+    index_course(db, course)
     db.commit()
     db.refresh(course)
+    title_index.upsert(course.id, course.title, course.is_published)
+    bump_catalog_version()
     return course
 
 
 def update_course(db: Session, course: Course, payload: CourseUpdate) -> Course:
     if payload.title:
-        duplicate = (
-            db.query(Course)
-            .filter(func.lower(Course.title) == payload.title.lower(), Course.id != course.id)
-            .first()
-        )
-        if duplicate:
-            raise client_error("COURSE_EXISTS", "Курс с таким названием уже существует", field="title", status_code=400)
         course.title = payload.title
     if payload.description is not None:
         course.description = payload.description
@@ -94,11 +149,89 @@ def update_course(db: Session, course: Course, payload: CourseUpdate) -> Course:
     if payload.duration_minutes is not None:
         course.duration_minutes = payload.duration_minutes
     db.add(course)
+    _flush_course(db)
+    if payload.title or payload.description is not None:
+        index_course(db, course)
     db.commit()
     db.refresh(course)
+    title_index.upsert(course.id, course.title, course.is_published)
+    bump_catalog_version()
     return course
 
 
 def delete_course(db: Session, course: Course) -> None:
+    """Один DELETE курса: материалы, задания, решения и записи удаляет БД по ondelete="CASCADE"."""
+    course_id = course.id
+    remove_course_from_index(db, course_id)
     db.delete(course)
     db.commit()
+    title_index.remove(course_id)
+    bump_catalog_version()
+
+
+def hide_course(db: Session, course: Course) -> None:
+    """Снимает курс с публикации, помечает pending_delete и убирает из поиска до фонового удаления (purge_course)."""
+    course.is_published = False
+    course.pending_delete = True
+    remove_course_from_index(db, course.id)
+    db.commit()
+    title_index.remove(course.id)
+    bump_catalog_version()
+
+
+def purge_course(course_id: int, chunk_size: int | None = None) -> bool:
+    """Фоновое удаление большого курса: записи и решения пачками по chunk_size строк, каждая в своей транзакции.
+
+    Ни одна транзакция не держит блокировки на всех строках курса сразу; остальное удаляет каскад.
+    Записи удаляются первыми: без записи на курс новое решение уже не пройдёт проверку.
+    Повторный запуск продолжает с того места, где прервался; при ошибке курс остаётся с pending_delete.
+    """
+    chunk_size = chunk_size or settings.course_delete_chunk_size
+    assignment_ids = select(Assignment.id).where(Assignment.course_id == course_id)
+    children = (
+        (Enrollment, Enrollment.course_id == course_id),
+        (AssignmentSubmission, AssignmentSubmission.assignment_id.in_(assignment_ids)),
+    )
+    try:
+        with SessionLocal() as db:
+            for model, condition in children:
+                while True:
+                    chunk = select(model.id).where(condition).limit(chunk_size).scalar_subquery()
+                    deleted = db.execute(delete(model).where(model.id.in_(chunk))).rowcount
+                    db.commit()
+                    if deleted < chunk_size:
+                        break
+            db.execute(delete(Course).where(Course.id == course_id))
+            db.commit()
+    except Exception:  # noqa: BLE001 - фоновая задача: ошибку некому вернуть, курс дочистит purge_pending_courses
+        logger.exception("Background delete of course %s failed, it stays pending_delete", course_id)
+        return False
+    bump_catalog_version()
+    return True
+
+
+def purge_pending_courses(db: Session) -> tuple[int, int]:
+    """Дочищает курсы, фоновое удаление которых не завершилось; возвращает (удалено, с ошибкой)."""
+    course_ids = db.scalars(select(Course.id).where(Course.pending_delete.is_(True)).order_by(Course.id)).all()
+    db.close()
+    purged = sum(purge_course(course_id) for course_id in course_ids)
+    return purged, len(course_ids) - purged
+
+
+def repair_students_count(db: Session) -> int:
+    """Пересчитывает courses.students_count по enrollments, возвращает число исправленных курсов."""
+    actual = (
+        select(func.count(Enrollment.id))
+        .where(Enrollment.course_id == Course.id)
+        .correlate(Course)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(Course)
+        .where(Course.students_count != actual)
+        .values(students_count=actual)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    bump_catalog_version()
+    return result.rowcount or 0
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import re
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.course import Course
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _normalize(value: str) -> list[str]:
+    return [word.lower() for word in _WORD_RE.findall(value)]
+
+
+def _trigrams(word: str) -> set[str]:
+    padded = f"  {word} "
+    return {padded[index : index + 3] for index in range(len(padded) - 2)}
+
+
+class CourseTitleIndex:
+    """Индекс названий опубликованных курсов для автодополнения.
+
+    Отсортированный массив суффиксов по словам ("advanced python", "python")
+    даёт поиск по префиксу через bisect, а таблица триграмм слов подбирает
+    варианты с опечатками, когда префиксных совпадений не хватает.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._titles: dict[int, str] = {}
+        self._suffixes: list[tuple[str, int]] = []
+        self._grams: dict[str, set[int]] = {}
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return
+        rows = db.execute(select(Course.id, Course.title).where(Course.is_published.is_(True))).all()
+        with self._lock:
+            self._titles.clear()
+            self._suffixes.clear()
+            self._grams.clear()
+            for course_id, title in rows:
+                self._add_locked(course_id, title)
+            self._suffixes.sort()
+            self._loaded_at = time.monotonic()
+
+    def upsert(self, course_id: int, title: str, is_published: bool) -> None:
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._remove_locked(course_id)
+            if is_published:
+                self._add_locked(course_id, title, keep_sorted=True)
+
+    def remove(self, course_id: int) -> None:
+        with self._lock:
+            if self._loaded_at is not None:
+                self._remove_locked(course_id)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._titles.clear()
+            self._suffixes.clear()
+            self._grams.clear()
+            self._loaded_at = None
+
+    def suggest(self, query: str, limit: int = 10) -> list[tuple[int, str]]:
+        words = _normalize(query)
+        if not words:
+            return []
+        prefix = " ".join(words)
+        found: list[int] = []
+        with self._lock:
+            position = bisect_left(self._suffixes, (prefix, -1))
+            while position < len(self._suffixes) and len(found) < limit:
+                suffix, course_id = self._suffixes[position]
+                if not suffix.startswith(prefix):
+                    break
+                if course_id not in found:
+                    found.append(course_id)
+                position += 1
+            if len(found) < limit and len(words[-1]) >= 3:
+                found.extend(self._fuzzy_locked(words[-1], limit - len(found), exclude=set(found)))
+            return [(course_id, self._titles[course_id]) for course_id in found]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            size = sys.getsizeof(self._titles) + sys.getsizeof(self._suffixes) + sys.getsizeof(self._grams)
+            size += sum(sys.getsizeof(title) for title in self._titles.values())
+            size += sum(sys.getsizeof(entry) + sys.getsizeof(entry[0]) for entry in self._suffixes)
+            size += sum(sys.getsizeof(gram) + sys.getsizeof(ids) for gram, ids in self._grams.items())
+            return {
+                "courses": len(self._titles),
+                "suffixes": len(self._suffixes),
+                "trigrams": len(self._grams),
+                "approx_bytes": size,
+            }
+
+    def _fuzzy_locked(self, word: str, limit: int, exclude: set[int]) -> list[int]:
+        grams = _trigrams(word)
+        scores: Counter[int] = Counter()
+        for gram in grams:
+            for course_id in self._grams.get(gram, ()):
+                if course_id not in exclude:
+                    scores[course_id] += 1
+        threshold = max(2, len(grams) // 2)
+        return [course_id for course_id, score in scores.most_common(limit) if score >= threshold]
+
+    def _add_locked(self, course_id: int, title: str, keep_sorted: bool = False) -> None:
+        self._titles[course_id] = title
+        words = _normalize(title)
+        for index in range(len(words)):
+            entry = (" ".join(words[index:]), course_id)
+            if keep_sorted:
+                insort(self._suffixes, entry)
+            else:
+                self._suffixes.append(entry)
+        for word in set(words):
+            for gram in _trigrams(word):
+                self._grams.setdefault(gram, set()).add(course_id)
+
+    def _remove_locked(self, course_id: int) -> None:
+        title = self._titles.pop(course_id, None)
+        if title is None:
+            return
+        words = _normalize(title)
+        for index in range(len(words)):
+            entry = (" ".join(words[index:]), course_id)
+            position = bisect_left(self._suffixes, entry)
+            if position < len(self._suffixes) and self._suffixes[position] == entry:
+                del self._suffixes[position]
+        for word in set(words):
+            for gram in _trigrams(word):
+                ids = self._grams.get(gram)
+                if ids is not None:
+                    ids.discard(course_id)
+                    if not ids:
+                        del self._grams[gram]
+
+
+title_index = CourseTitleIndex(ttl_seconds=settings.course_suggest_ttl_seconds)
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from typing import Iterator
+
 from fastapi import HTTPException
+from sqlalchemy import literal, select, update
 from sqlalchemy.orm import Session
 
+from app.db.upsert import insert_ignoring_conflicts
 from app.models.enrollment import Enrollment
 from app.models.course import Course
-from app.models.user import User
+from app.models.user import User, UserRole, normalize_email
+from app.schemas.enrollment import BulkEnrollmentResponse, BulkEnrollmentResult
+from app.services.catalog_cache import bump_catalog_version
+from app.services.export_service import ExportFormat, export_rows
 from app.utils.exceptions import client_error
 
 
@@ -17,17 +24,116 @@ def get_enrollment(db: Session, user_id: int, course_id: int) -> Enrollment | No
     )
 
 
-def create_enrollment(db: Session, user_id: int, course: Course) -> Enrollment:
+def create_enrollment(db: Session, user_id: int, course_id: int, idempotent: bool = False):
+    """Запись на курс одним INSERT ... SELECT ... WHERE EXISTS(опубликованный курс) ON CONFLICT DO NOTHING RETURNING.
+
+    Двойной клик не упирается в уникальный индекс: второй запрос просто не вставит строку.
+    Если строка не вставлена, причина выясняется отдельным запросом: курса нет
+    (404) или запись уже есть — 409, а при idempotent=True возвращается существующая запись.
+    """
+    published = select(Course.id).where(Course.id == course_id, Course.is_published.is_(True)).exists()
+    statement = (
+        insert_ignoring_conflicts(db, Enrollment, ["user_id", "course_id"])
+        .from_select(["user_id", "course_id"], select(literal(user_id), literal(course_id)).where(published))
+        .returning(Enrollment.id, Enrollment.user_id, Enrollment.course_id, Enrollment.enrolled_at)
+    )
+    enrollment = db.execute(statement).first()
+    if enrollment is None:
+        existing = get_enrollment(db, user_id, course_id)
+        if existing is None:
+            raise client_error("COURSE_NOT_FOUND", "Курс не найден", status_code=404)
+        if not idempotent:
+            raise client_error("ALREADY_ENROLLED", "Пользователь уже записан", status_code=409)
+        return existing
+    db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(students_count=Course.students_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    bump_catalog_version()
+    return enrollment
+
+
+def _chunks(values: list, size: int) -> Iterator[list]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def bulk_enroll(
+    db: Session,
+    course: Course,
+    user_ids: list[int],
+    emails: list[str],
+    batch_size: int = 1000,
+) -> BulkEnrollmentResponse:
+    """Записывает на курс сразу многих студентов.
+
+    Пользователи ищутся пачками по id и email, затем на каждую пачку один
+    INSERT ... ON CONFLICT DO NOTHING RETURNING: вернувшиеся user_id — новые записи,
+    остальные уже были на курсе. Всё в одной транзакции, students_count обновляется один раз.
+    """
     if not course.is_published:
         raise client_error("COURSE_UNPUBLISHED", "Курс не опубликован", status_code=404)
-    existing = get_enrollment(db, user_id, course.id)
-    if existing:
-        raise client_error("ALREADY_ENROLLED", "Пользователь уже записан", status_code=409)
-    enrollment = Enrollment(user_id=user_id, course_id=course.id)
-    db.add(enrollment)
+    found_by_id: dict[int, UserRole] = {}
+    for chunk in _chunks(list(dict.fromkeys(user_ids)), batch_size):
+        found_by_id.update(db.execute(select(User.id, User.role).where(User.id.in_(chunk))).tuples().all())
+    found_by_email: dict[str, tuple[int, UserRole]] = {}
+    for chunk in _chunks(list(dict.fromkeys(normalize_email(email) for email in emails)), batch_size):
+        rows = db.execute(select(User.id, User.email_normalized, User.role).where(User.email_normalized.in_(chunk)))
+        found_by_email.update((email, (user_id, role)) for user_id, email, role in rows)
+
+    requested: list[tuple[int | None, str | None, int | None, UserRole | None]] = []
+    for user_id in user_ids:
+        requested.append((user_id, None, user_id if user_id in found_by_id else None, found_by_id.get(user_id)))
+    for email in emails:
+        user_id, role = found_by_email.get(normalize_email(email), (None, None))
+        requested.append((None, email, user_id, role))
+
+    students = list(dict.fromkeys(user_id for _, _, user_id, role in requested if role == UserRole.student))
+    # Один скомпилированный оператор на все пачки: драйвер разворачивает параметры
+    # в многострочный VALUES (insertmanyvalues), по одному INSERT на batch_size строк.
+    statement = insert_ignoring_conflicts(db, Enrollment, ["user_id", "course_id"]).returning(Enrollment.user_id)
+    connection = db.connection().execution_options(insertmanyvalues_page_size=batch_size)
+    inserted: set[int] = set()
+    if students:
+        inserted.update(
+            connection.execute(
+                statement, [{"user_id": user_id, "course_id": course.id} for user_id in students]
+            ).scalars()
+        )
+    if inserted:
+        db.execute(
+            update(Course)
+            .where(Course.id == course.id)
+            .values(students_count=Course.students_count + len(inserted))
+            .execution_options(synchronize_session=False)
+        )
     db.commit()
-    db.refresh(enrollment)
-    return enrollment
+    if inserted:
+        bump_catalog_version()
+
+    results = []
+    seen: set[int] = set()
+    for requested_id, email, user_id, role in requested:
+        if user_id is None:
+            status = "not_found"
+        elif role != UserRole.student:
+            status = "not_student"
+        elif user_id in seen:
+            status = "duplicate"
+        else:
+            status = "enrolled" if user_id in inserted else "already_enrolled"
+        if user_id is not None:
+            seen.add(user_id)
+        results.append(BulkEnrollmentResult(user_id=user_id if user_id is not None else requested_id, email=email, status=status))
+    return BulkEnrollmentResponse(
+        course_id=course.id,
+        enrolled=len(inserted),
+        already_enrolled=len(students) - len(inserted),
+        results=results,
+    )
 
 
 def list_student_enrollments(db: Session, user_id: int) -> list[Enrollment]:
@@ -41,3 +147,20 @@ def list_course_students(db: Session, course_id: int) -> list[User]:
         .filter(Enrollment.course_id == course_id)
         .all()
     )
+
+
+def export_course_students(db: Session, course_id: int, format: ExportFormat) -> Iterator[bytes]:
+    """Студенты курса потоком (тот же join, что в list_course_students, но только колонки)."""
+    statement = (
+        select(
+            User.id.label("user_id"),
+            User.email,
+            User.full_name,
+            User.role,
+            Enrollment.enrolled_at,
+        )
+        .join(Enrollment, Enrollment.user_id == User.id)
+        .where(Enrollment.course_id == course_id)
+        .order_by(Enrollment.id)
+    )
+    return export_rows(db, statement, format)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, Iterator, Literal
+
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+# Ячейка, начинающаяся с этих символов, исполняется Excel/LibreOffice как формула.
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _plain(value: Any, for_csv: bool = False) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if for_csv and isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        # Тексты студентов (сообщение, ссылка, имя) не должны становиться формулами в отчёте.
+        return "'" + value
+    return value
+
+
+def export_rows(db: Session, statement: Select, format: ExportFormat, batch_size: int = 1000) -> Iterator[bytes]:
+    """Результат запроса в CSV или NDJSON: серверный курсор, по одному куску на пачку из batch_size строк.
+
+    В памяти держится только текущая пачка. Закрытие генератора (close()) закрывает курсор.
+    """
+    result = db.execute(statement, execution_options={"stream_results": True, "yield_per": batch_size})
+    try:
+        columns = list(result.keys())
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for partition in result.partitions():
+                writer.writerows([_plain(value, for_csv=True) for value in row] for row in partition)
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode()
+        else:
+            for partition in result.partitions():
+                yield "".join(
+                    json.dumps({column: _plain(value) for column, value in zip(columns, row)}, ensure_ascii=False) + "\n"
+                    for row in partition
+                ).encode()
+    finally:
+        result.close()
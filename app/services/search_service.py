@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import DDL, column, event, func, literal_column, table, text
+from sqlalchemy.orm import Query, Session
+
+from app.models.course import Course
+
+# SQLite: теневая FTS5-таблица, rowid = courses.id, обновляется из course_service.
+# PostgreSQL: генерируемая колонка tsvector с GIN-индексом, её поддерживает сама БД.
+_courses_fts = table("courses_fts", column("rowid"), column("rank"))
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_CREATE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts "
+    "USING fts5(title, description, tokenize='unicode61 remove_diacritics 2')"
+)
+POSTGRES_ADD_VECTOR = (
+    "ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED"
+)
+POSTGRES_CREATE_GIN = "CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING gin (search_vector)"
+
+event.listen(Course.__table__, "after_create", DDL(SQLITE_CREATE_FTS).execute_if(dialect="sqlite"))
+event.listen(Course.__table__, "before_drop", DDL("DROP TABLE IF EXISTS courses_fts").execute_if(dialect="sqlite"))
+event.listen(Course.__table__, "after_create", DDL(POSTGRES_ADD_VECTOR).execute_if(dialect="postgresql"))
+event.listen(Course.__table__, "after_create", DDL(POSTGRES_CREATE_GIN).execute_if(dialect="postgresql"))
+
+
+def _dialect(db: Session) -> str:
+    return db.get_bind().dialect.name
+
+
+def _tokens(search: str) -> list[str]:
+    return [token.lower() for token in _TOKEN_RE.findall(search)]
+
+
+def apply_search(query: Query, db: Session, search: str) -> tuple[Query, object | None]:
+    """Фильтр полнотекстового поиска по префиксам слов; возвращает запрос и выражение для сортировки по релевантности."""
+    tokens = _tokens(search)
+    if not tokens:
+        return query, None
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        match = " ".join(f'"{token}"*' for token in tokens)
+        query = query.join(_courses_fts, _courses_fts.c.rowid == Course.id).filter(
+            literal_column("courses_fts").op("MATCH")(match)
+        )
+        return query, _courses_fts.c.rank.asc()
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+        vector = literal_column("courses.search_vector")
+        query = query.filter(vector.op("@@")(ts_query))
+        return query, func.ts_rank(vector, ts_query).desc()
+    pattern = f"%{search}%"
+    return query.filter(Course.title.ilike(pattern) | Course.description.ilike(pattern)), None
+
+
+def index_course(db: Session, course: Course) -> None:
+    if _dialect(db) != "sqlite":
+        return
+    db.execute(text("DELETE FROM courses_fts WHERE rowid = :id"), {"id": course.id})
+    db.execute(
+        text("INSERT INTO courses_fts (rowid, title, description) VALUES (:id, :title, :description)"),
+        {"id": course.id, "title": course.title, "description": course.description or ""},
+    )
+
+
+def remove_course_from_index(db: Session, course_id: int) -> None:
+    if _dialect(db) == "sqlite":
+        db.execute(text("DELETE FROM courses_fts WHERE rowid = :id"), {"id": course_id})
+
+
+def rebuild_search_index(db: Session) -> None:
+    dialect = _dialect(db)
+    if dialect == "sqlite":
+        db.execute(text(SQLITE_CREATE_FTS))
+        db.execute(text("DELETE FROM courses_fts"))
+        db.execute(
+            text(
+                "INSERT INTO courses_fts (rowid, title, description) "
+                "SELECT id, title, coalesce(description, '') FROM courses"
+            )
+        )
+    elif dialect == "postgresql":
+        db.execute(text(POSTGRES_ADD_VECTOR))
+        db.execute(text(POSTGRES_CREATE_GIN))
+        db.execute(text("REINDEX INDEX ix_courses_search_vector"))
+    db.commit()
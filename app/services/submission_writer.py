@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import SUBMISSION_DURABILITY_MODES, settings
+from app.db.session import SessionLocal
+from app.models.assignment_submission import AssignmentSubmission
+
+logger = logging.getLogger("app.submissions")
+
+
+class SubmissionQueueFull(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class StoredSubmission:
+    id: int
+    submitted_at: datetime
+
+
+@dataclass
+class _Pending:
+    values: dict
+    future: Future
+
+
+class SubmissionWriter:
+    """Групповая запись решений: один INSERT на пачку и один commit каждые interval_ms.
+
+    Запросы кладут уже проверенные решения в ограниченную очередь и ждут future
+    с id и submitted_at. При durability="relaxed" в PostgreSQL commit пачки не ждёт
+    сброса WAL на диск (synchronous_commit=off): после падения сервера можно потерять
+    последние подтверждённые решения, но не целостность. В других СУБД режимы совпадают.
+    """
+
+    def __init__(
+        self,
+        interval_ms: int,
+        max_batch: int,
+        queue_size: int,
+        durability: str = "strict",
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        if durability not in SUBMISSION_DURABILITY_MODES:
+            raise ValueError(f"Unknown submission durability mode: {durability}")
+        self.interval = max(interval_ms, 0) / 1000
+        self.max_batch = max(max_batch, 1)
+        self.durability = durability
+        self._session_factory = session_factory
+        self._queue: queue.Queue[_Pending | None] = queue.Queue(maxsize=max(queue_size, 1))
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.written = 0
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="submission-writer", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, values: dict) -> Future:
+        self._ensure_started()
+        pending = _Pending(values={**values, "submitted_at": datetime.now(timezone.utc)}, future=Future())
+        try:
+            self._queue.put_nowait(pending)
+        except queue.Full as exc:
+            raise SubmissionQueueFull("Submission queue is full") from exc
+        return pending.future
+
+    async def submit(self, values: dict) -> StoredSubmission:
+        return await asyncio.wrap_future(self.enqueue(values))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _collect(self, first: _Pending) -> tuple[list[_Pending], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stopping = self._collect(first)
+            try:
+                self._flush(batch)
+            except Exception as exc:  # noqa: BLE001 - ошибка пачки отдаётся всем ожидающим
+                logger.exception("Submission batch of %s failed", len(batch))
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(exc)
+
+    def _prepare(self, db: Session) -> None:
+        if self.durability == "relaxed" and db.get_bind().dialect.name == "postgresql":
+            db.execute(text("SET LOCAL synchronous_commit TO off"))
+
+    def _flush(self, batch: list[_Pending]) -> None:
+        statement = insert(AssignmentSubmission).returning(
+            AssignmentSubmission.id, AssignmentSubmission.submitted_at, sort_by_parameter_order=True
+        )
+        with self._session_factory() as db:
+            self._prepare(db)
+            try:
+                rows = db.execute(statement, [pending.values for pending in batch]).all()
+                db.commit()
+            except IntegrityError:
+                # Гонка повторов с одним Idempotency-Key: пишем пачку построчно в savepoint'ах,
+                # ошибку получает только конфликтующее решение.
+                db.rollback()
+                self._prepare(db)
+                rows = []
+                for pending in batch:
+                    try:
+                        with db.begin_nested():
+                            rows.append(db.execute(statement, pending.values).first())
+                    except IntegrityError as exc:
+                        rows.append(exc)
+                db.commit()
+        self.batches += 1
+        for pending, row in zip(batch, rows):
+            if isinstance(row, Exception):
+                pending.future.set_exception(row)
+            else:
+                self.written += 1
+                pending.future.set_result(StoredSubmission(id=row.id, submitted_at=row.submitted_at))
+
+    def shutdown(self) -> None:
+        """Дописывает уже принятые решения и останавливает поток."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+
+submission_writer = SubmissionWriter(
+    interval_ms=settings.submission_batch_interval_ms,
+    max_batch=settings.submission_batch_max_size,
+    queue_size=settings.submission_queue_size,
+    durability=settings.submission_durability,
+)
@@ -1,25 +1,101 @@
 from __future__ import annotations
 
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+import time
+from dataclasses import dataclass
+from datetime import datetime
 
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session, object_session
+
+from app.core.cache import ExpiringLRUCache
+from app.core.config import settings
 from app.core.security import get_password_hash
-from app.models.user import User, UserRole
+from app.models.course import Course
+from app.models.enrollment import Enrollment
+from app.models.user import User, UserRole, normalize_email
 from app.schemas.user import UserCreate
 
+principal_cache = ExpiringLRUCache(
+    "principals",
+    settings.principal_cache_size if settings.principal_cache_enabled else 0,
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str
+    role: UserRole
+    full_name: str | None
+    created_at: datetime
+
 
 def get_user(db: Session, user_id: int) -> User | None:
     return db.query(User).filter(User.id == user_id).first()
 
 
+def get_principal(db: Session, user_id: int) -> Principal | None:
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    user = get_user(db, user_id)
+    if user is None:
+        return None
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        role=user.role,
+        full_name=user.full_name,
+        created_at=user.created_at,
+    )
+    principal_cache.set(user_id, principal, time.time() + settings.principal_cache_ttl_seconds)
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    principal_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal_on_write(mapper, connection, target: User) -> None:
+    invalidate_principal(target.id)
+    # Между flush и commit параллельный get_principal может снова закешировать старую строку,
+    # поэтому id запоминаются в сессии и сбрасываются ещё раз после commit.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("written_principals", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals_after_commit(session: Session) -> None:
+    for user_id in session.info.pop("written_principals", ()):
+        invalidate_principal(user_id)
+
+@event.listens_for(User, "before_delete")
+def _release_enrollments_on_delete(mapper, connection, target: User) -> None:
+    # Записи пользователя удаляет каскад БД (passive_deletes) мимо enrollment_service,
+    # поэтому students_count его курсов уменьшаем здесь, пока записи ещё на месте.
+    connection.execute(
+        update(Course)
+        .where(Course.id.in_(select(Enrollment.course_id).where(Enrollment.user_id == target.id)))
+        .values(students_count=Course.students_count - 1)
+    )
+
+
 def get_user_by_email(db: Session, email: str) -> User | None:
-    return db.query(User).filter(func.lower(User.email) == email.lower()).first()
+    return db.query(User).filter(User.email_normalized == normalize_email(email)).first()
 
 
-def create_user(db: Session, user_create: UserCreate, role: UserRole | str = UserRole.student) -> User:
+def create_user(
+    db: Session,
+    user_create: UserCreate,
+    role: UserRole | str = UserRole.student,
+    hashed_password: str | None = None,
+) -> User:
     user = User(
         email=user_create.email,
-        hashed_password=get_password_hash(user_create.password),
+        hashed_password=hashed_password or get_password_hash(user_create.password),
         full_name=user_create.full_name,
         role=UserRole(role) if isinstance(role, str) else role,
     )
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+
+
+def encode_keyset_cursor(timestamp: datetime, row_id: int) -> str:
+    """Непрозрачный курсор (timestamp, id) для keyset-пагинации."""
+    raw = json.dumps([timestamp.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_keyset_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import AsyncIterator, Iterator
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
+
+_DONE = object()
+
+
+async def iterate_closing(iterator: Iterator[bytes]) -> AsyncIterator[bytes]:
+    """Синхронный генератор по кускам в пуле потоков; при разрыве соединения закрывает его.
+
+    StreamingResponse отменяет отдачу, когда клиент отключился; close() в finally
+    доводит отмену до генератора, и тот закрывает серверный курсор сразу, а не при сборке мусора.
+    """
+    try:
+        while True:
+            chunk = await run_in_threadpool(next, iterator, _DONE)
+            if chunk is _DONE:
+                break
+            yield chunk
+    finally:
+        iterator.close()
+
+
+def streaming_export(iterator: Iterator[bytes], media_type: str, filename: str | None = None) -> StreamingResponse:
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(iterate_closing(iterator), media_type=media_type, headers=headers)
@@ -0,0 +1 @@
+"""Нагрузочные сценарии, запускаются вручную: python -m benchmarks.<имя>."""
@@ -0,0 +1,73 @@
+"""Запись когорты на курс: POST /courses/{id}/enrollments/bulk против вызова /enroll на каждого студента.
+
+    python -m benchmarks.bulk_enroll --students 10000 --sample 500
+
+Поштучный путь измеряется на выборке --sample студентов и экстраполируется на всю когорту.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import make_client, setup_database
+
+
+def _seed(students: int) -> None:
+    from app.db.session import SessionLocal
+    from app.models.course import Course
+    from app.models.user import User, UserRole
+
+    setup_database()
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=1, email="admin@bench.local", hashed_password="x", role=UserRole.admin))
+        db.execute(
+            insert(User),
+            [
+                {"id": index, "email": f"student{index}@bench.local", "hashed_password": "x", "role": UserRole.student}
+                for index in range(2, students + 2)
+            ],
+        )
+        db.execute(insert(Course), [{"id": course_id, "title": f"Course {course_id}", "is_published": True, "created_by": 1} for course_id in (1, 2)])
+        db.commit()
+
+
+async def _run(students: int, sample: int) -> None:
+    from app.core.security import create_access_token
+
+    admin = {"Authorization": f"Bearer {create_access_token(data={'sub': '1', 'role': 'admin'})}"}
+    async with make_client() as client:
+        started = time.perf_counter()
+        response = await client.post(
+            "/courses/1/enrollments/bulk",
+            json={"user_ids": list(range(2, students + 2))},
+            headers=admin,
+        )
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        print(f"bulk: {response.json()['enrolled']} enrollments in {elapsed * 1000:.0f}ms")
+
+        tokens = [create_access_token(data={"sub": str(user_id), "role": "student"}) for user_id in range(2, sample + 2)]
+        started = time.perf_counter()
+        for token in tokens:
+            (await client.post("/courses/2/enroll", headers={"Authorization": f"Bearer {token}"})).raise_for_status()
+        elapsed = time.perf_counter() - started
+        print(
+            f"per-request: {sample} enrollments in {elapsed * 1000:.0f}ms "
+            f"(~{elapsed / sample * students:.1f}s for {students})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=10000)
+    parser.add_argument("--sample", type=int, default=500)
+    args = parser.parse_args()
+    _seed(args.students)
+    asyncio.run(_run(args.students, args.sample))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import os
+import tempfile
+
+_db_path = os.path.join(tempfile.mkdtemp(prefix="lms-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_path}")
+os.environ.setdefault("RATE_LIMIT_REQUESTS", "100000000")
+
+import httpx  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import engine  # noqa: E402
+
+
+def setup_database() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def make_client() -> httpx.AsyncClient:
+    from main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def report(name: str, samples: list[float]) -> None:
+    print(
+        f"{name}: n={len(samples)} "
+        f"p50={percentile(samples, 50) * 1000:.2f}ms "
+        f"p99={percentile(samples, 99) * 1000:.2f}ms"
+    )
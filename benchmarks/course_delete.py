@@ -0,0 +1,116 @@
+"""Удаление популярного курса: каскад в БД против прежнего каскада через ORM.
+
+    python -m benchmarks.course_delete --enrollments 100000 --submissions 100000
+
+orm — как до passive_deletes: все дочерние строки загружаются в сессию и удаляются по одной.
+database — DELETE /courses/{id}, каскад выполняет БД.
+background — DELETE /courses/{id}?background=true: время ответа и время фоновой очистки пачками.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import make_client, setup_database
+
+
+def _seed(enrollments: int, submissions: int) -> None:
+    from app.db.session import SessionLocal
+    from app.models.assignment import Assignment
+    from app.models.assignment_submission import AssignmentSubmission
+    from app.models.course import Course
+    from app.models.enrollment import Enrollment
+    from app.models.user import User, UserRole
+    from app.services.search_service import rebuild_search_index
+
+    setup_database()
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=1, email="admin@bench.local", hashed_password="x", role=UserRole.admin))
+        db.execute(
+            insert(User),
+            [
+                {"id": index, "email": f"student{index}@bench.local", "hashed_password": "x", "role": UserRole.student}
+                for index in range(2, enrollments + 2)
+            ],
+        )
+        db.execute(
+            insert(Course),
+            [
+                {"id": course_id, "title": f"Course {course_id}", "is_published": True, "created_by": 1}
+                for course_id in (1, 2, 3)
+            ],
+        )
+        for course_id in (1, 2, 3):
+            db.execute(
+                insert(Enrollment), [{"user_id": index, "course_id": course_id} for index in range(2, enrollments + 2)]
+            )
+            db.execute(
+                insert(Assignment),
+                [{"id": course_id * 10 + index, "course_id": course_id, "title": "Task"} for index in range(10)],
+            )
+            db.execute(
+                insert(AssignmentSubmission),
+                [
+                    {"assignment_id": course_id * 10 + index % 10, "user_id": 2 + index % enrollments, "message": "Done"}
+                    for index in range(submissions)
+                ],
+            )
+        db.commit()
+        rebuild_search_index(db)
+
+
+def _orm_cascade(course_id: int) -> float:
+    from sqlalchemy.orm import selectinload
+
+    from app.db.session import SessionLocal
+    from app.models.assignment import Assignment
+    from app.models.course import Course
+
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        course = (
+            db.query(Course)
+            .options(
+                selectinload(Course.enrollments),
+                selectinload(Course.materials),
+                selectinload(Course.assignments).selectinload(Assignment.submissions),
+            )
+            .filter(Course.id == course_id)
+            .one()
+        )
+        db.delete(course)
+        db.commit()
+    return time.perf_counter() - started
+
+
+async def _run() -> None:
+    from app.core.security import create_access_token
+
+    admin = {"Authorization": f"Bearer {create_access_token(data={'sub': '1', 'role': 'admin'})}"}
+    print(f"orm: {_orm_cascade(1) * 1000:.0f}ms")
+    async with make_client() as client:
+        started = time.perf_counter()
+        (await client.delete("/courses/2", headers=admin)).raise_for_status()
+        print(f"database: {(time.perf_counter() - started) * 1000:.0f}ms")
+
+        started = time.perf_counter()
+        response = await client.delete("/courses/3", params={"background": True}, headers=admin)
+        response.raise_for_status()
+        # ASGITransport ждёт фоновые задачи, поэтому общее время включает очистку пачками.
+        print(f"background: status {response.status_code}, purged in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--enrollments", type=int, default=100000)
+    parser.add_argument("--submissions", type=int, default=100000)
+    args = parser.parse_args()
+    _seed(args.enrollments, args.submissions)
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
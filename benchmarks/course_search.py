@@ -0,0 +1,74 @@
+"""Поиск по каталогу: полнотекстовый индекс против ilike '%term%'.
+
+    python -m benchmarks.course_search --courses 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import setup_database
+
+_SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "su", "do", "ga"]
+_WORDS = sorted({a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--courses", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    from app.db.session import SessionLocal
+    from app.models.course import Course
+    from app.models.user import User, UserRole
+    from app.services.course_service import _apply_course_filters
+    from app.services.search_service import rebuild_search_index
+
+    setup_database()
+    rng = random.Random(1)
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=1, email="bench@example.com", hashed_password="x", role=UserRole.admin))
+        batch = []
+        for index in range(args.courses):
+            words = rng.sample(_WORDS, 3)
+            batch.append(
+                {
+                    "title": f"{' '.join(words).title()} {index}",
+                    "description": " ".join(rng.sample(_WORDS, 5)),
+                    "is_published": True,
+                    "created_by": 1,
+                }
+            )
+            if len(batch) == 10000:
+                db.execute(insert(Course), batch)
+                batch.clear()
+        if batch:
+            db.execute(insert(Course), batch)
+        db.commit()
+        rebuild_search_index(db)
+
+        for label in ("fulltext", "ilike"):
+            samples = []
+            for _ in range(args.queries):
+                term = rng.choice(_WORDS)[:4]
+                started = time.perf_counter()
+                if label == "fulltext":
+                    query, rank = _apply_course_filters(db, db.query(Course), term, True, None)
+                    query.order_by(rank, Course.created_at.desc()).limit(10).all()
+                else:
+                    pattern = f"%{term}%"
+                    db.query(Course).filter(
+                        Course.is_published.is_(True),
+                        Course.title.ilike(pattern) | Course.description.ilike(pattern),
+                    ).order_by(Course.created_at.desc()).limit(10).all()
+                samples.append(time.perf_counter() - started)
+            samples.sort()
+            print(f"{label}: p50={samples[len(samples) // 2] * 1000:.1f}ms max={samples[-1] * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
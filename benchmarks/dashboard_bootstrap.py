@@ -0,0 +1,120 @@
+"""Загрузка дашборда: пять отдельных вызовов против одного /me/bootstrap.
+
+    python -m benchmarks.dashboard_bootstrap --iterations 300
+
+Для каждого сценария печатает p50/p99 времени загрузки страницы и число
+SQL-запросов на одну загрузку.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert
+
+from benchmarks.common import make_client, report, setup_database
+
+FAN_OUT = {
+    "student": ["/users/me", "/courses/", "/me/enrollments", "/assignments/"],
+    "admin": ["/users/me", "/courses/", "/assignments/", "/assignments/admin-overview"],
+}
+
+
+def _seed(courses: int, assignments_per_course: int, submissions: int) -> None:
+    from app.db.session import SessionLocal
+    from app.models.assignment import Assignment
+    from app.models.assignment_submission import AssignmentSubmission
+    from app.models.course import Course
+    from app.models.enrollment import Enrollment
+    from app.models.user import User, UserRole
+
+    setup_database()
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        db.execute(
+            insert(User),
+            [
+                {"id": 1, "email": "admin@bench.local", "hashed_password": "x", "role": UserRole.admin},
+                {"id": 2, "email": "student@bench.local", "hashed_password": "x", "role": UserRole.student},
+            ],
+        )
+        db.execute(
+            insert(Course),
+            [
+                {"id": index, "title": f"Course {index}", "is_published": True, "created_by": 1, "students_count": 1}
+                for index in range(1, courses + 1)
+            ],
+        )
+        db.execute(insert(Enrollment), [{"user_id": 2, "course_id": index} for index in range(1, courses + 1)])
+        db.execute(
+            insert(Assignment),
+            [
+                {
+                    "course_id": course_id,
+                    "title": f"Task {course_id}.{number}",
+                    "due_date": now + timedelta(days=number),
+                }
+                for course_id in range(1, courses + 1)
+                for number in range(assignments_per_course)
+            ],
+        )
+        total_assignments = courses * assignments_per_course
+        db.execute(
+            insert(AssignmentSubmission),
+            [
+                {
+                    "assignment_id": index % total_assignments + 1,
+                    "user_id": 2,
+                    "message": f"Answer {index}",
+                    "submitted_at": now - timedelta(seconds=index),
+                }
+                for index in range(submissions)
+            ],
+        )
+        db.commit()
+
+
+async def _load(client, paths: list[str], headers: dict[str, str]) -> None:
+    responses = await asyncio.gather(*(client.get(path, headers=headers) for path in paths))
+    for response in responses:
+        response.raise_for_status()
+
+
+async def _run(iterations: int) -> None:
+    from app.core.security import create_access_token
+    from app.db.query_stats import add_observer
+
+    statements = [0]
+    add_observer(lambda scope, stats: statements.__setitem__(0, statements[0] + stats.count))
+
+    async with make_client() as client:
+        for role, user_id in (("student", 2), ("admin", 1)):
+            token = create_access_token(data={"sub": str(user_id), "role": role})
+            headers = {"Authorization": f"Bearer {token}"}
+            for label, paths in (("fan-out", FAN_OUT[role]), ("bootstrap", ["/me/bootstrap"])):
+                await _load(client, paths, headers)
+                statements[0] = 0
+                samples = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    await _load(client, paths, headers)
+                    samples.append(time.perf_counter() - started)
+                report(f"{role} {label} ({len(paths)} calls)", samples)
+                print(f"  SQL statements per page load: {statements[0] / iterations:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--courses", type=int, default=20)
+    parser.add_argument("--assignments-per-course", type=int, default=5)
+    parser.add_argument("--submissions", type=int, default=20000)
+    args = parser.parse_args()
+    _seed(args.courses, args.assignments_per_course, args.submissions)
+    asyncio.run(_run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""p99 для GET /courses во время шторма логинов.
+
+    python -m benchmarks.login_storm --logins 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import make_client, report, setup_database
+
+
+async def _poll_courses(client, stop: asyncio.Event, samples: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/courses/")
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.005)
+
+
+async def _run(logins: int) -> None:
+    from app.db.session import SessionLocal
+    from app.schemas.user import UserCreate
+    from app.services.user_service import create_user
+
+    setup_database()
+    with SessionLocal() as db:
+        create_user(db, UserCreate(email="storm@example.com", password="safe_pass123"))
+
+    async with make_client() as client:
+        baseline: list[float] = []
+        stop = asyncio.Event()
+        poller = asyncio.create_task(_poll_courses(client, stop, baseline))
+        await asyncio.sleep(2)
+        stop.set()
+        await poller
+
+        under_load: list[float] = []
+        stop = asyncio.Event()
+        poller = asyncio.create_task(_poll_courses(client, stop, under_load))
+        payload = {"email": "storm@example.com", "password": "wrong-password"}
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(client.post("/auth/login", json=payload) for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await poller
+
+    statuses: dict[int, int] = {}
+    for response in responses:
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    report("GET /courses idle", baseline)
+    report("GET /courses during logins", under_load)
+    print(f"{logins} logins in {elapsed:.2f}s, statuses={statuses}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(_run(args.logins))
+
+
+if __name__ == "__main__":
+    main()
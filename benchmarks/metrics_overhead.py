@@ -0,0 +1,54 @@
+"""Стоимость записи метрик на один запрос.
+
+    python -m benchmarks.metrics_overhead --iterations 200000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from app.core.metrics import MetricsMiddleware, MetricsRegistry
+
+
+class _Route:
+    path = "/courses/{course_id}"
+
+
+async def _empty_app(scope, receive, send) -> None:
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _send(message) -> None:
+    pass
+
+
+async def _per_request(app, iterations: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/courses/1", "headers": []}
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(scope), None, _send)
+    return (time.perf_counter() - started) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    started = time.perf_counter()
+    for index in range(args.iterations):
+        registry.observe("GET", "/courses/{course_id}", 200, (index % 100) / 1000)
+    observe = (time.perf_counter() - started) / args.iterations
+
+    bare = asyncio.run(_per_request(_empty_app, args.iterations))
+    wrapped = asyncio.run(_per_request(MetricsMiddleware(_empty_app, MetricsRegistry()), args.iterations))
+    print(f"observe():          {observe * 1e6:.2f}us")
+    print(f"middleware overhead: {(wrapped - bare) * 1e6:.2f}us/request")
+
+
+if __name__ == "__main__":
+    main()
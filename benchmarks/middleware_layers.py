@@ -0,0 +1,75 @@
+"""Задержка каждого слоя middleware по отдельности поверх пустого ASGI-приложения.
+
+    python -m benchmarks.middleware_layers --iterations 50000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from starlette.middleware.cors import CORSMiddleware
+
+from app.middleware.security import HTTPSRedirectMiddleware, RateLimitMiddleware, RequestSizeLimitMiddleware
+
+_SCOPE = {
+    "type": "http",
+    "method": "POST",
+    "path": "/courses/",
+    "scheme": "https",
+    "client": ("127.0.0.1", 50000),
+    "headers": [(b"host", b"bench"), (b"content-length", b"128"), (b"x-forwarded-proto", b"https")],
+}
+
+
+async def _empty_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _layers() -> dict[str, object]:
+    return {
+        "none": _empty_app,
+        "RequestSizeLimitMiddleware": RequestSizeLimitMiddleware(_empty_app, max_size=1024),
+        "RateLimitMiddleware": RateLimitMiddleware(_empty_app, requests=10**9, window_seconds=1),
+        "HTTPSRedirectMiddleware": HTTPSRedirectMiddleware(_empty_app, require_https=True),
+        "CORSMiddleware": CORSMiddleware(_empty_app, allow_origins=["*"]),
+    }
+
+
+async def _time_layer(app, iterations: int) -> tuple[float, set[int]]:
+    statuses: set[int] = set()
+
+    async def send(message) -> None:
+        if message["type"] == "http.response.start":
+            statuses.add(message["status"])
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await app(dict(_SCOPE), _receive, send)
+    return (time.perf_counter() - started) / iterations, statuses
+
+
+def measure_layers(iterations: int) -> dict[str, tuple[float, set[int]]]:
+    async def run() -> dict[str, tuple[float, set[int]]]:
+        return {name: await _time_layer(app, iterations) for name, app in _layers().items()}
+
+    return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+    results = measure_layers(args.iterations)
+    baseline = results["none"][0]
+    for name, (seconds, _) in results.items():
+        print(f"{name:28s} {seconds * 1e6:7.2f}us/request (+{(seconds - baseline) * 1e6:.2f}us)")
+
+
+if __name__ == "__main__":
+    main()
